@@ -0,0 +1,87 @@
+"""
+쿨다운 확인(cooldown.Cooldowns.check)에 걸리는 시간과, 버킷이 만료된 뒤 정리되는지 측정합니다.
+사용자 몇 명이 명령어를 연달아 보내는 상황에서 몇 건이 거절되는지도 출력합니다.
+
+    $ python bench/cooldowns.py --checks 1000000 --users 100000
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import cast
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+import cooldown  # noqa: E402
+from discord.ext.commands import Context  # noqa: E402
+
+
+@cooldown.limit(5, 60, concurrency=1)
+async def unpack_box(ctx):
+    pass
+
+
+@cooldown.limit(1, 10)
+@cooldown.limit(30, 60, scope="guild")
+async def subscribe(ctx):
+    pass
+
+
+def make_context(callback, name: str, user_id: int, guild_id: int) -> Context:
+    # Cooldowns가 사용하는 속성만 흉내 냅니다.
+    command = SimpleNamespace(callback=callback, qualified_name=name)
+    ctx = SimpleNamespace(
+        command=command,
+        author=SimpleNamespace(id=user_id),
+        guild=SimpleNamespace(id=guild_id),
+        channel=SimpleNamespace(id=guild_id + 1),
+    )
+    return cast(Context, ctx)
+
+
+def run(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    cooldowns = cooldown.Cooldowns()
+    commands = [(unpack_box, "상자"), (subscribe, "구독")]
+    contexts = [
+        make_context(*rng.choice(commands), rng.randrange(args.users), rng.randrange(10))
+        for _ in range(min(args.checks, 100000))
+    ]
+
+    results = {}
+    started = time.perf_counter()
+    for i in range(args.checks):
+        ctx = contexts[i % len(contexts)]
+        reason = cooldowns.check(ctx)
+        if reason is None:
+            cooldowns.release(ctx)
+        results[reason or "allowed"] = results.get(reason or "allowed", 0) + 1
+    elapsed = time.perf_counter() - started
+
+    buckets = sum(map(len, cooldowns.tables.values()))
+    for table in cooldowns.tables.values():
+        table.sweep(time.monotonic() + 3600)
+    return {
+        "checks": args.checks,
+        "check_ns": 1e9 * elapsed / args.checks,
+        "results": results,
+        "buckets": buckets,
+        "buckets_after_expiry": sum(map(len, cooldowns.tables.values())),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=str(__doc__).strip().splitlines()[0])
+    parser.add_argument("--checks", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(run(args), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+명령어 코드를 디스코드 게이트웨이 없이 실행하기 위한 가짜 discord.py 객체들입니다.
+명령어가 사용하는 속성과 메서드만 흉내 냅니다.
+"""
+import asyncio
+import itertools
+from typing import AbstractSet, Callable, Dict, List, Optional, Set, Tuple
+
+snowflakes = itertools.count(700000000000000000)
+
+
+class FakeRole:
+    def __init__(self, role_id: int) -> None:
+        self.id = role_id
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FakeRole) and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+
+class FakeMember:
+    def __init__(self, member_id: int, roles: List[FakeRole]) -> None:
+        self.id = member_id
+        self.roles = roles
+        self.mention = f"<@{member_id}>"
+        self.bot = False
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FakeMember) and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+    async def add_roles(self, *roles) -> None:
+        self.roles.extend(roles)
+
+    async def remove_roles(self, *roles) -> None:
+        self.roles = [role for role in self.roles if role not in roles]
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int, role_ids: List[int]) -> None:
+        self.id = guild_id
+        self.roles = {role_id: FakeRole(role_id) for role_id in role_ids}
+
+    def get_role(self, role_id: int) -> Optional[FakeRole]:
+        return self.roles.get(role_id)
+
+
+class FakeReaction:
+    def __init__(self, emoji: str, message: "FakeMessage") -> None:
+        self.emoji = emoji
+        self.message = message
+
+
+class FakeRawReaction:
+    def __init__(self, emoji: str, message_id: int, channel_id: int, user_id: int):
+        self.emoji = emoji
+        self.message_id = message_id
+        self.channel_id = channel_id
+        self.user_id = user_id
+
+
+class FakeMessage:
+    def __init__(self, bot: "FakeBot", channel: "FakeChannel", content, embed) -> None:
+        self.id = next(snowflakes)
+        self.bot = bot
+        self.channel = channel
+        self.content = content
+        self.embed = embed
+        self.reactions: List[str] = []
+
+    async def add_reaction(self, emoji: str) -> None:
+        await asyncio.sleep(self.bot.rest_latency)
+        self.reactions.append(emoji)
+        # 메시지를 보고 있는 사용자가 원하던 이모지라면 잠시 뒤 반응을 누릅니다.
+        for member, wanted in self.channel.watchers.get(self.id, ()):
+            if emoji in wanted:
+                asyncio.ensure_future(self.click(emoji, member))
+
+    async def click(self, emoji: str, member: "FakeMember") -> None:
+        await asyncio.sleep(self.bot.think_time)
+        self.bot.dispatch("reaction_add", FakeReaction(emoji, self), member)
+        self.bot.dispatch(
+            "raw_reaction_add", FakeRawReaction(emoji, self.id, self.channel.id, member.id)
+        )
+
+    async def edit(self, content=None, embed=None) -> None:
+        await asyncio.sleep(self.bot.rest_latency)
+        self.content = content
+        self.embed = embed
+
+
+class FakeChannel:
+    def __init__(self, bot: "FakeBot") -> None:
+        self.id = next(snowflakes)
+        self.bot = bot
+        self.sent: List[FakeMessage] = []
+        # 메시지 ID -> (반응을 누를 사용자, 누를 이모지 목록)
+        self.watchers: Dict[int, List[Tuple[FakeMember, Set[str]]]] = {}
+
+    async def send(self, content=None, *, embed=None, file=None) -> FakeMessage:
+        await asyncio.sleep(self.bot.rest_latency)
+        message = FakeMessage(self.bot, self, content, embed)
+        self.sent.append(message)
+        self.bot.sent_count += 1
+        self.bot.dispatch("bot_message", message)
+        return message
+
+
+class FakeContext:
+    """
+    commands.Context 대신 사용합니다.
+    wanted_emojis는 봇이 띄운 선택지 중 이 사용자가 누를 이모지들입니다.
+    """
+
+    def __init__(
+        self,
+        bot: "FakeBot",
+        author: FakeMember,
+        guild: FakeGuild,
+        channel: FakeChannel,
+        wanted_emojis: AbstractSet[str] = frozenset(),
+    ) -> None:
+        self.bot = bot
+        self.author = author
+        self.guild = guild
+        self.channel = channel
+        self.wanted_emojis = set(wanted_emojis)
+        self.replies: List[FakeMessage] = []
+
+    async def send(self, content=None, *, embed=None, file=None) -> FakeMessage:
+        message = await self.channel.send(content, embed=embed, file=file)
+        self.replies.append(message)
+        if self.wanted_emojis:
+            self.channel.watchers[message.id] = [(self.author, self.wanted_emojis)]
+        return message
+
+
+class FakeBot:
+    """
+    discord.py의 wait_for/add_listener/dispatch를 흉내 냅니다.
+    rest_latency는 디스코드 REST API 호출 한 번에 걸리는 시간을 흉내 냅니다.
+    """
+
+    def __init__(self, rest_latency: float = 0.0, think_time: float = 0.0) -> None:
+        self.rest_latency = rest_latency
+        self.think_time = think_time
+        self.sent_count = 0
+        self.extra_events: Dict[str, List] = {}
+        self._listeners: Dict[
+            str, List[Tuple[asyncio.Future, Callable[..., bool]]]
+        ] = {}
+
+    def add_listener(self, func, name=None) -> None:
+        self.extra_events.setdefault(name or func.__name__, []).append(func)
+
+    def dispatch(self, event: str, *args) -> None:
+        for func in self.extra_events.get(f"on_{event}", []):
+            asyncio.ensure_future(func(*args))
+
+        # wait_for와 마찬가지로 대기 중인 조건을 모두 확인합니다.
+        listeners = self._listeners.get(event, [])
+        for future, check in list(listeners):
+            if future.done():
+                listeners.remove((future, check))
+            elif check(*args):
+                future.set_result(args[0] if len(args) == 1 else args)
+                listeners.remove((future, check))
+
+    async def wait_for(self, event: str, *, check=None, timeout=None):
+        future = asyncio.get_event_loop().create_future()
+        self._listeners.setdefault(event, []).append(
+            (future, check or (lambda *args: True))
+        )
+        return await asyncio.wait_for(future, timeout)
@@ -0,0 +1,352 @@
+"""
+디스코드 REST API와 게이트웨이를 최소한으로 흉내 내는 로컬 서버입니다.
+봇 프로세스에 DISCORD_API_BASE를 지정하면 실제 디스코드 대신 이 서버에 접속합니다.
+
+    $ python bench/fake_gateway.py --port 8001 --guilds 100 --shards 4
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from aiohttp import WSMsgType, web
+
+bot_user = {
+    "id": "700000000000000001",
+    "username": "lara",
+    "discriminator": "0001",
+    "avatar": None,
+    "bot": True,
+}
+timestamp = "2020-01-01T00:00:00+00:00"
+
+# 게이트웨이 인텐트 비트
+GUILD_MEMBERS = 1 << 1
+GUILD_PRESENCES = 1 << 8
+GUILD_MESSAGES = 1 << 9
+
+
+def json_response(data: dict) -> web.Response:
+    # discord.py는 Content-Type이 정확히 application/json일 때만 본문을 JSON으로 읽습니다.
+    return web.Response(
+        body=json.dumps(data).encode(), headers={"Content-Type": "application/json"}
+    )
+
+
+class FakeGateway:
+    """
+    guild_count개의 서버를 만들고, IDENTIFY한 샤드에 (guild_id >> 22) % shard_count 규칙에 따라
+    해당하는 서버만 보냅니다. 샤드별 IDENTIFY 기록과 봇이 보낸 메시지를 기록합니다.
+    """
+
+    def __init__(
+        self, guild_count: int, recommended_shards: int = 1, members_per_guild: int = 0
+    ) -> None:
+        self.recommended_shards = recommended_shards
+        self.members_per_guild = members_per_guild
+        self.snowflakes = itertools.count(800000000000000000)
+        self.guilds = [self.make_guild(index) for index in range(guild_count)]
+        self.base_url = ""
+        # 봇이 IDENTIFY할 때 알려준 전체 샤드 수
+        self.shard_count = 1
+
+        # 샤드 ID -> IDENTIFY 시각 목록
+        self.identifies: Dict[int, List[float]] = defaultdict(list)
+        # 샤드 ID -> 연결된 웹소켓
+        self.sessions: Dict[int, web.WebSocketResponse] = {}
+        # 샤드 ID -> IDENTIFY할 때 요청한 인텐트
+        self.intents: Dict[int, int] = {}
+        # 샤드 ID가 같은 웹소켓이 동시에 연결된 횟수
+        self.overlaps = 0
+        # 채널 ID -> 봇이 보낸 메시지 내용 목록
+        self.sent: Dict[int, List[str]] = defaultdict(list)
+        self.requests: Counter = Counter()
+
+    def make_guild(self, index: int) -> dict:
+        # 샤드 배정에 쓰이는 상위 비트가 고르게 나뉘도록 ID를 만듭니다.
+        guild_id = ((index + 1) << 22) | index
+        channel_id = guild_id + 1
+        users = [
+            {
+                "id": str(guild_id * 1000 + number),
+                "username": f"member {number}",
+                "discriminator": f"{number % 10000:04}",
+                "avatar": None,
+            }
+            for number in range(self.members_per_guild)
+        ]
+        return {
+            "id": str(guild_id),
+            "name": f"guild {index}",
+            "owner_id": bot_user["id"],
+            "region": "south-korea",
+            "roles": [
+                {
+                    "id": str(guild_id),
+                    "name": "@everyone",
+                    "permissions": 104324673,
+                    "position": 0,
+                    "color": 0,
+                    "hoist": False,
+                    "managed": False,
+                    "mentionable": False,
+                }
+            ],
+            "channels": [
+                {
+                    "id": str(channel_id),
+                    "type": 0,
+                    "name": "general",
+                    "position": 0,
+                    "permission_overwrites": [],
+                    "nsfw": False,
+                    "parent_id": None,
+                }
+            ],
+            "members": [
+                {
+                    "user": user,
+                    "nick": None,
+                    "roles": [],
+                    "joined_at": timestamp,
+                    "deaf": False,
+                    "mute": False,
+                }
+                for user in [bot_user, *users]
+            ],
+            "member_count": len(users) + 1,
+            "large": False,
+            "unavailable": False,
+            "emojis": [],
+            "features": [],
+            "presences": [
+                {
+                    "user": {"id": user["id"]},
+                    "status": "online",
+                    "activities": [{"name": "라라봇 부하 테스트", "type": 0}],
+                    "client_status": {"desktop": "online"},
+                }
+                for user in users
+            ],
+            "voice_states": [],
+        }
+
+    def shard_of(self, guild: dict, shard_count: int) -> int:
+        return (int(guild["id"]) >> 22) % shard_count
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.middleware])
+        app.router.add_get("/api/v7/users/@me", self.get_me)
+        app.router.add_get("/api/v7/oauth2/applications/@me", self.get_application)
+        app.router.add_get("/api/v7/gateway", self.get_gateway)
+        app.router.add_get("/api/v7/gateway/bot", self.get_gateway)
+        app.router.add_post("/api/v7/channels/{channel_id}/messages", self.post_message)
+        app.router.add_get("/ws", self.websocket)
+        return app
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler):
+        resource = request.match_info.route.resource
+        path = resource.canonical if resource is not None else request.path
+        self.requests[f"{request.method} {path}"] += 1
+        return await handler(request)
+
+    async def get_me(self, request: web.Request) -> web.Response:
+        return json_response(bot_user)
+
+    async def get_application(self, request: web.Request) -> web.Response:
+        return json_response(
+            {
+                "id": bot_user["id"],
+                "name": bot_user["username"],
+                "icon": None,
+                "description": "",
+                "rpc_origins": None,
+                "bot_public": False,
+                "bot_require_code_grant": False,
+                "owner": {**bot_user, "id": "1", "bot": False},
+                "summary": "",
+                "verify_key": "",
+                "team": None,
+            }
+        )
+
+    async def get_gateway(self, request: web.Request) -> web.Response:
+        return json_response(
+            {
+                "url": self.base_url.replace("http", "ws") + "/ws",
+                "shards": self.recommended_shards,
+                "session_start_limit": {
+                    "total": 1000,
+                    "remaining": 1000,
+                    "reset_after": 0,
+                },
+            }
+        )
+
+    async def post_message(self, request: web.Request) -> web.Response:
+        channel_id = int(request.match_info["channel_id"])
+        data = await request.json()
+        self.sent[channel_id].append(data.get("content") or "")
+        return json_response(
+            {
+                "id": str(next(self.snowflakes)),
+                "channel_id": str(channel_id),
+                "author": bot_user,
+                "content": data.get("content") or "",
+                "timestamp": timestamp,
+                "edited_timestamp": None,
+                "tts": False,
+                "mention_everyone": False,
+                "mentions": [],
+                "mention_roles": [],
+                "attachments": [],
+                "embeds": [data["embed"]] if data.get("embed") else [],
+                "pinned": False,
+                "type": 0,
+            }
+        )
+
+    async def websocket(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"op": 10, "d": {"heartbeat_interval": 41250}})
+
+        shard_id: Optional[int] = None
+        sequence = itertools.count(1)
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                payload = json.loads(msg.data)
+                if payload["op"] == 1:
+                    await ws.send_json({"op": 11})
+                elif payload["op"] == 2:
+                    identified, self.shard_count = payload["d"].get("shard", [0, 1])
+                    shard_id = identified
+                    if identified in self.sessions:
+                        self.overlaps += 1
+                    self.sessions[identified] = ws
+                    self.intents[identified] = payload["d"].get("intents", -1)
+                    self.identifies[identified].append(time.time())
+                    await self.send_ready(ws, sequence, identified, self.shard_count)
+        finally:
+            if shard_id is not None and self.sessions.get(shard_id) is ws:
+                del self.sessions[shard_id]
+        return ws
+
+    async def send_ready(self, ws, sequence, shard_id: int, shard_count: int) -> None:
+        guilds = [g for g in self.guilds if self.shard_of(g, shard_count) == shard_id]
+        await ws.send_json(
+            {
+                "op": 0,
+                "t": "READY",
+                "s": next(sequence),
+                "d": {
+                    "v": 6,
+                    "user": bot_user,
+                    "guilds": [{"id": g["id"], "unavailable": True} for g in guilds],
+                    "session_id": f"session-{shard_id}",
+                    "shard": [shard_id, shard_count],
+                    "private_channels": [],
+                    "relationships": [],
+                },
+            }
+        )
+        intents = self.intents.get(shard_id, -1)
+        for guild in guilds:
+            # 실제 디스코드처럼 인텐트가 없으면 멤버 목록과 접속 상태를 보내지 않습니다.
+            guild = dict(guild)
+            if not intents & (GUILD_MEMBERS | GUILD_PRESENCES):
+                guild["members"] = guild["members"][:1]
+            if not intents & GUILD_PRESENCES:
+                guild["presences"] = []
+            await ws.send_json(
+                {"op": 0, "t": "GUILD_CREATE", "s": next(sequence), "d": guild}
+            )
+
+    async def send_message(self, guild: dict, author_id: int, content: str) -> bool:
+        """
+        guild의 첫 번째 채널에 사용자가 메시지를 보낸 것처럼 MESSAGE_CREATE를 보냅니다.
+        해당 샤드가 연결되어 있지 않거나 메시지 인텐트가 없으면 False를 반환합니다.
+        """
+        shard_id = self.shard_of(guild, self.shard_count)
+        ws = self.sessions.get(shard_id)
+        if ws is None or not self.intents.get(shard_id, -1) & GUILD_MESSAGES:
+            return False
+
+        channel = guild["channels"][0]
+        await ws.send_json(
+            {
+                "op": 0,
+                "t": "MESSAGE_CREATE",
+                "s": None,
+                "d": {
+                    "id": str(next(self.snowflakes)),
+                    "channel_id": channel["id"],
+                    "guild_id": guild["id"],
+                    "author": {
+                        "id": str(author_id),
+                        "username": f"user{author_id}",
+                        "discriminator": "0001",
+                        "avatar": None,
+                    },
+                    "member": {
+                        "roles": [],
+                        "joined_at": timestamp,
+                        "deaf": False,
+                        "mute": False,
+                    },
+                    "content": content,
+                    "timestamp": timestamp,
+                    "edited_timestamp": None,
+                    "tts": False,
+                    "mention_everyone": False,
+                    "mentions": [],
+                    "mention_roles": [],
+                    "attachments": [],
+                    "embeds": [],
+                    "pinned": False,
+                    "type": 0,
+                },
+            }
+        )
+        return True
+
+
+async def start(gateway: FakeGateway, host: str = "127.0.0.1", port: int = 0):
+    """
+    서버를 시작하고 (AppRunner, DISCORD_API_BASE에 지정할 URL) 튜플을 반환합니다.
+    """
+    runner = web.AppRunner(gateway.app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = runner.addresses[0][1]
+    gateway.base_url = f"http://{host}:{port}"
+    return runner, f"{gateway.base_url}/api/v7"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=str(__doc__).strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--guilds", type=int, default=100)
+    parser.add_argument("--members", type=int, default=0, help="서버당 멤버 수")
+    parser.add_argument(
+        "--shards", type=int, default=1, help="/gateway/bot이 권장하는 샤드 수"
+    )
+    args = parser.parse_args()
+
+    loop = asyncio.get_event_loop()
+    gateway = FakeGateway(args.guilds, args.shards, args.members)
+    _, api_base = loop.run_until_complete(start(gateway, args.host, args.port))
+    print(f"DISCORD_API_BASE={api_base}")
+    loop.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+라라봇이 사용하는 FORTE API 엔드포인트를 흉내 내는 로컬 서버입니다.
+응답 지연과 에러를 임의로 주입할 수 있으며, 엔드포인트별 요청 수를 기록합니다.
+
+    $ python bench/forte_stub.py --port 8000 --latency 0.02 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import re
+from collections import Counter
+from typing import Dict, Optional
+
+from aiohttp import web
+
+id_segment_pattern = re.compile(r"/\d+(?=/|$)")
+
+
+class FakeForte:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        unregistered_rate: float = 0.0,
+        inventory_size: int = 20,
+        seed: Optional[int] = None,
+        consumed_rate: float = 0.3,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.unregistered_rate = unregistered_rate
+        self.inventory_size = inventory_size
+        self.consumed_rate = consumed_rate
+        self.random = random.Random(seed)
+
+        self.users: Dict[int, dict] = {}
+        self.discord_links: Dict[int, Optional[int]] = {}
+        self.key_counts: Dict[int, int] = {}
+        self.items: Dict[int, Dict[int, dict]] = {}
+        self.user_ids = itertools.count(1)
+        self.item_ids = itertools.count(1)
+        self.receipt_ids = itertools.count(1)
+
+        self.requests: Counter = Counter()
+        self.injected_errors = 0
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.middleware])
+        app.router.add_get("/discords/{discord_id}", self.get_discord_user)
+        app.router.add_get("/discords/{discord_id}/attendances", self.get_attendance)
+        app.router.add_post("/discords/{discord_id}/attendances", self.post_attendance)
+        app.router.add_post("/discords/{discord_id}/attendances/unpack", self.unpack)
+        app.router.add_get("/users/{user_id}", self.get_user)
+        app.router.add_get("/users/{user_id}/items", self.get_items)
+        app.router.add_get("/users/{user_id}/items/{item_id}", self.get_item)
+        app.router.add_delete("/users/{user_id}/items/{item_id}", self.delete_item)
+        app.router.add_post("/users/{user_id}/points", self.post_points)
+        app.router.add_post("/clients/{client_id}/refresh", self.refresh)
+        return app
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler):
+        self.requests[f"{request.method} {id_segment_pattern.sub('/{id}', request.path)}"] += 1
+
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.random.random() < self.error_rate:
+            self.injected_errors += 1
+            return web.Response(status=502, text="<html>502 Bad Gateway</html>")
+
+        return await handler(request)
+
+    # 테스트 데이터
+
+    def create_user(self) -> dict:
+        user_id = next(self.user_ids)
+        user = {
+            "id": user_id,
+            "name": f"user{user_id}",
+            "email": f"user{user_id}@example.com",
+            "points": self.random.randint(0, 1000),
+            "created_at": "2020-01-01 00:00:00",
+            "deleted_at": None,
+        }
+        self.users[user_id] = user
+        self.key_counts[user_id] = self.random.randint(0, 10)
+        self.items[user_id] = {}
+        for _ in range(self.inventory_size):
+            self.add_item(user_id)
+        return user
+
+    def add_item(self, user_id: int) -> dict:
+        item_id = next(self.item_ids)
+        price = self.random.choice((0, 100, 300, 500))
+        item = {
+            "id": item_id,
+            "item_id": self.random.randint(1, 20),
+            "expired": 0,
+            "consumed": int(self.random.random() < self.consumed_rate),
+            "sync": 0,
+            "created_at": "2020-01-01 00:00:00",
+            "item": {"name": f"item{item_id}", "price": price},
+        }
+        self.items[user_id][item_id] = item
+        return item
+
+    def linked_user(self, discord_id: int) -> Optional[dict]:
+        if discord_id not in self.discord_links:
+            registered = self.random.random() >= self.unregistered_rate
+            self.discord_links[discord_id] = (
+                self.create_user()["id"] if registered else None
+            )
+        user_id = self.discord_links[discord_id]
+        return None if user_id is None else self.users[user_id]
+
+    def find_user(self, request: web.Request) -> Optional[dict]:
+        return self.users.get(int(request.match_info["user_id"]))
+
+    def find_item(self, request: web.Request) -> Optional[dict]:
+        items = self.items.get(int(request.match_info["user_id"]), {})
+        return items.get(int(request.match_info["item_id"]))
+
+    # 엔드포인트
+
+    async def get_discord_user(self, request: web.Request) -> web.Response:
+        user = self.linked_user(int(request.match_info["discord_id"]))
+        return web.json_response(user or [])
+
+    async def get_attendance(self, request: web.Request) -> web.Response:
+        user = self.linked_user(int(request.match_info["discord_id"]))
+        if user is None:
+            return web.json_response({})
+        return web.json_response({"key_count": self.key_counts[user["id"]]})
+
+    async def post_attendance(self, request: web.Request) -> web.Response:
+        user = self.linked_user(int(request.match_info["discord_id"]))
+        if user is None:
+            return web.json_response({"error": "unregistered"}, status=404)
+
+        if self.key_counts[user["id"]] >= 10:
+            return web.json_response({"status": "max_key_count"}, status=409)
+
+        self.key_counts[user["id"]] += 1
+        return web.json_response(
+            {"status": "success", "key_count": self.key_counts[user["id"]]},
+            status=201,
+        )
+
+    async def unpack(self, request: web.Request) -> web.Response:
+        user = self.linked_user(int(request.match_info["discord_id"]))
+        cost = {"bronze": 3, "silver": 6, "gold": 10}.get(request.query.get("box", ""))
+        if user is None or cost is None:
+            return web.json_response({"error": "bad request"}, status=404)
+
+        if request.query.get("isPremium") == "1" and cost > 3:
+            cost -= 1 if cost == 6 else 2
+        if self.key_counts[user["id"]] < cost:
+            return web.json_response({"error": "insufficient key"}, status=400)
+
+        self.key_counts[user["id"]] -= cost
+        point = self.random.choice((3, 10, 20)) * cost // 3
+        user["points"] += point
+        return web.json_response(
+            {"point": point, "key_count": self.key_counts[user["id"]]}
+        )
+
+    async def get_user(self, request: web.Request) -> web.Response:
+        user = self.find_user(request)
+        if user is None:
+            return web.json_response("not found", status=404)
+        return web.json_response(user)
+
+    async def get_items(self, request: web.Request) -> web.Response:
+        user = self.find_user(request)
+        if user is None:
+            return web.json_response({"message": "User not found"}, status=404)
+        return web.json_response(list(self.items[user["id"]].values()))
+
+    async def get_item(self, request: web.Request) -> web.Response:
+        item = self.find_item(request)
+        if item is None:
+            return web.json_response({"message": "Item not found"}, status=404)
+        return web.json_response(
+            {
+                "id": item["id"],
+                "name": item["item"]["name"],
+                "price": item["item"]["price"],
+                "expired": item["expired"],
+            }
+        )
+
+    async def delete_item(self, request: web.Request) -> web.Response:
+        item = self.find_item(request)
+        if item is None:
+            return web.json_response({"message": "Item not found"}, status=404)
+        item["expired"] = 1
+        return web.json_response({})
+
+    async def post_points(self, request: web.Request) -> web.Response:
+        user = self.find_user(request)
+        if user is None:
+            return web.json_response({"message": "User not found"}, status=404)
+        body = await request.json()
+        user["points"] += int(body["points"])
+        return web.json_response({"receipt_id": next(self.receipt_ids)}, status=201)
+
+    async def refresh(self, request: web.Request) -> web.Response:
+        return web.json_response({"token": f"token-{self.random.getrandbits(64):x}"})
+
+
+async def start(forte: FakeForte, host: str = "127.0.0.1", port: int = 0):
+    """
+    서버를 시작하고 (AppRunner, 기본 URL) 튜플을 반환합니다.
+    port가 0이면 사용 가능한 포트를 임의로 고릅니다.
+    """
+    runner = web.AppRunner(forte.app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=str(__doc__).strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--unregistered-rate", type=float, default=0.0)
+    parser.add_argument("--inventory-size", type=int, default=20)
+    args = parser.parse_args()
+
+    forte = FakeForte(
+        args.latency,
+        args.jitter,
+        args.error_rate,
+        args.unregistered_rate,
+        args.inventory_size,
+    )
+    web.run_app(forte.app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+구매 기록이 많은 사용자의 아이템 목록(GET /users/{id}/items)을 가져와 청약철회 가능한 아이템을 고르는
+시간과 메모리 사용량을 디코딩 방식별로 측정합니다.
+
+    $ python bench/items.py --inventory-size 100000 --repeat 5
+
+- buffered: 이전 방식입니다. resp.json()으로 본문 전체를 디코딩한 뒤 목록을 거릅니다.
+- buffered_orjson: 본문 전체를 orjson으로 디코딩한 뒤 목록을 거릅니다. (orjson이 설치된 경우)
+- stream: api.stream_list()로 본문을 받는 대로 디코딩하면서 거릅니다.
+
+FORTE 스텁은 별도 프로세스에서 실행하므로, 메모리 사용량(tracemalloc 최대값)에는 봇 쪽 할당만 포함됩니다.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import socket
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, cast
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+import api  # noqa: E402
+import jsonstream  # noqa: E402
+from extensions.forte import Forte  # noqa: E402
+from forte_stub import FakeForte, start  # noqa: E402
+
+# is_refundable이 사용하는 속성만 가진 Forte 대신입니다.
+forte = cast(Forte, SimpleNamespace(refund_disabled=frozenset()))
+
+
+def is_refundable(item: dict) -> bool:
+    return Forte.is_refundable(forte, item)
+
+
+async def buffered(resp):
+    return [item for item in await resp.json() if is_refundable(item)]
+
+
+async def buffered_orjson(resp):
+    body = await jsonstream.read_json(resp, jsonstream.loader("orjson"))
+    return [item for item in body if is_refundable(item)]
+
+
+def serve(port: int, inventory_size: int, consumed_rate: float) -> None:
+    forte = FakeForte(inventory_size=inventory_size, consumed_rate=consumed_rate)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    loop.run_until_complete(start(forte, port=port))
+    loop.run_forever()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_stub(url: str, timeout: float = 10) -> None:
+    session = await api.open_session()
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with session.get(url + "/users/0") as resp:
+                await resp.read()
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def measure(decode, repeat: int) -> dict:
+    endpoint = "/users/1/items"
+    wall, cpu = [], []
+    for _ in range(repeat):
+        started, started_cpu = time.perf_counter(), time.process_time()
+        result, resp = await api.request("get", endpoint, decode=decode)
+        wall.append(time.perf_counter() - started)
+        cpu.append(time.process_time() - started_cpu)
+        del result, resp
+
+    # tracemalloc은 할당마다 비용이 크므로 시간 측정과 따로 실행합니다.
+    tracemalloc.start()
+    result, resp = await api.request("get", endpoint, decode=decode)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "kept": len(result),
+        "latency_ms": 1000 * statistics.median(wall),
+        "client_cpu_ms": 1000 * statistics.median(cpu),
+        "peak_mib": peak / 2**20,
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    port = free_port()
+    stub = multiprocessing.Process(
+        target=serve,
+        args=(port, args.inventory_size, args.consumed_rate),
+        daemon=True,
+    )
+    stub.start()
+    api.base_url = f"http://127.0.0.1:{port}"
+    api.token = api.token or "bench"
+    api.request_timeout = 600
+    await api.open_session()
+    try:
+        await wait_for_stub(api.base_url)
+        # 첫 디스코드 사용자 조회가 아이템을 가진 사용자 1을 만듭니다.
+        await api.request("get", "/discords/1")
+        body, _ = await api.request("get", "/users/1/items", decode=lambda r: r.read())
+
+        decoders: Dict[str, api.Decoder] = {"buffered": buffered}
+        if jsonstream.orjson is not None:
+            decoders["buffered_orjson"] = buffered_orjson
+        decoders["stream"] = api.stream_list(is_refundable)
+
+        report = {
+            "inventory_size": args.inventory_size,
+            "consumed_rate": args.consumed_rate,
+            "body_mib": len(body) / 2**20,
+            "chunk_size": api.stream_chunk_size,
+        }
+        del body
+        for name, decode in decoders.items():
+            report[name] = await measure(decode, args.repeat)
+        return report
+    finally:
+        await api.close_session()
+        stub.terminate()
+        stub.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=str(__doc__).strip().splitlines()[0])
+    parser.add_argument("--inventory-size", type=int, default=100000)
+    parser.add_argument(
+        "--consumed-rate",
+        type=float,
+        default=0.9,
+        help="이미 사용한 아이템의 비율 (오래된 사용자는 대부분 사용한 아이템입니다)",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=None,
+        help="stream 방식이 한 번에 읽는 바이트 수",
+    )
+    args = parser.parse_args()
+    if args.chunk_size is not None:
+        api.stream_chunk_size = args.chunk_size
+
+    report = asyncio.get_event_loop().run_until_complete(run(args))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+포인트 기록 장부(ledger)에 기록을 대량으로 쌓은 뒤, 기록 속도와 관리자 조회 명령어가 사용하는
+쿼리의 응답 시간, 기록 하나당 파일 크기를 측정합니다.
+
+    $ python bench/ledger_queries.py --entries 2000000 --users 50000 --days 365
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from ledger import Ledger  # noqa: E402
+from store import Store  # noqa: E402
+
+kinds = ["deposit", "bulk_deposit", "refund", "unpack"]
+
+
+def make_rows(args: argparse.Namespace, rng: random.Random, count: int, now: float):
+    rows = []
+    for _ in range(count):
+        kind = rng.choices(kinds, weights=[1, 2, 1, 20])[0]
+        user = rng.randrange(args.users)
+        created_at = now - rng.random() * args.days * 86400
+        if kind == "unpack":
+            discord_id = 10 ** 17 + user
+            rows.append(
+                (created_at, kind, discord_id, None, discord_id, rng.randrange(100), None, 0.02)
+            )
+        else:
+            rows.append(
+                (created_at, kind, 1, user, None, rng.randrange(1000), str(user), 0.02)
+            )
+    return rows
+
+
+async def timed(repeat: int, func, *args) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func(*args)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    path = Path(tempfile.mkdtemp(prefix="lara-ledger-")) / "lara.db"
+    store = Store(str(path))
+    await store.open()
+    report = {"entries": args.entries}
+    now = time.time()
+
+    try:
+        started = time.perf_counter()
+        for offset in range(0, args.entries, args.batch):
+            count = min(args.batch, args.entries - offset)
+            await store.append_ledger(make_rows(args, rng, count, now))
+        report["bulk_insert_per_second"] = args.entries / (time.perf_counter() - started)
+
+        # 명령어가 사용하는 경로: record()는 메모리에 모으기만 하고 백그라운드에서 기록합니다.
+        ledger = Ledger(store, 500, 1.0)
+        started = time.perf_counter()
+        for _ in range(args.records):
+            ledger.record("unpack", 1, 10, 0.02, discord_id=10 ** 17)
+        report["record_call_us"] = 1e6 * (time.perf_counter() - started) / args.records
+        started = time.perf_counter()
+        await ledger.close()
+        while ledger.written < args.records:
+            await asyncio.sleep(0.01)
+        report["record_written_per_second"] = args.records / (
+            time.perf_counter() - started
+        )
+
+        user = rng.randrange(args.users)
+        report["query_ms"] = {
+            name: 1000 * await timed(args.repeat, func, *params)
+            for name, func, params in [
+                ("totals_today", store.ledger_totals, (now,)),
+                ("totals_30_days", store.ledger_totals, (now - 29 * 86400,)),
+                ("totals_all", store.ledger_totals, (0,)),
+                ("user_totals", store.ledger_user_totals, (user, 10 ** 17 + user)),
+                ("user_entries", store.ledger_user_entries, (user, 10 ** 17 + user, 10)),
+            ]
+        }
+    finally:
+        await store.close()
+
+    size = sum(os.path.getsize(p) for p in path.parent.iterdir())
+    report["file_mib"] = size / 2 ** 20
+    report["bytes_per_entry"] = size / (args.entries + args.records)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=str(__doc__).strip().splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--records", type=int, default=20000, help="record()로 기록할 개수")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = asyncio.get_event_loop().run_until_complete(run(args))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
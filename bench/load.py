@@ -0,0 +1,268 @@
+"""
+실제 명령어 코드로 출석, 상자 열기, 포인트 지급 흐름을 동시에 대량으로 실행합니다.
+로컬 FORTE 서버(forte_stub)를 띄워 사용하므로 실제 FORTE API에는 요청을 보내지 않습니다.
+
+    $ python bench/load.py --flows 5000 --concurrency 1000 --latency 0.02
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import AbstractSet, Dict, List, cast
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+os.chdir(ROOT)
+for key, value in {
+    "GUILD_WHITELIST": "1",
+    "PREMIUM_ROLE": "2",
+    "SUBSCRIBER_ROLE": "3",
+    "ADMIN_ROLE": "4",
+    "DISABLE_WITHDRAW_ITEMS": "5,9,12",
+    "FORTE_TOKEN": "bench",
+    "ATTENDANCE_WORKERS": "16",
+}.items():
+    os.environ.setdefault(key, value)
+
+import api  # noqa: E402
+import interface  # noqa: E402
+import ledger  # noqa: E402
+import store  # noqa: E402
+from discord.ext import commands  # noqa: E402
+from discord_fakes import (  # noqa: E402
+    FakeBot,
+    FakeChannel,
+    FakeContext,
+    FakeGuild,
+    FakeMember,
+)
+from extensions import forte as forte_ext  # noqa: E402
+from extensions import user as user_ext  # noqa: E402
+from forte_stub import FakeForte, start  # noqa: E402
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def invoke(cog, command, ctx, *args) -> None:
+    """
+    검사와 쿨다운을 거치지 않고 명령어 본문만 실행합니다.
+    """
+    await command.callback(cog, ctx, *args)
+
+
+class Harness:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.bot = FakeBot(args.discord_latency, args.think_time)
+        # FakeBot은 dispatcher가 사용하는 add_listener만 흉내 냅니다.
+        interface.dispatcher.attach(cast(commands.Bot, self.bot))
+        self.user_cog = user_ext.User(self.bot)
+        self.forte_cog = forte_ext.Forte(self.bot)
+
+        role_ids = [self.user_cog.premium_role, self.forte_cog.admin_role]
+        self.guild = FakeGuild(self.user_cog.guild_whitelist[0], role_ids)
+        self.channels = [FakeChannel(self.bot) for _ in range(args.channels)]
+        self.discord_ids = [
+            100000000000000000 + i for i in range(args.users)
+        ]
+        self.admin = FakeMember(1, [self.guild.roles[self.forte_cog.admin_role]])
+
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self.outcomes: Dict[str, Counter] = defaultdict(Counter)
+
+    def context(
+        self, discord_id: int, wanted: AbstractSet[str] = frozenset()
+    ) -> FakeContext:
+        roles = []
+        if random.random() < self.args.premium_rate:
+            roles.append(self.guild.roles[self.user_cog.premium_role])
+        member = FakeMember(discord_id, roles)
+        return FakeContext(
+            self.bot, member, self.guild, random.choice(self.channels), wanted
+        )
+
+    async def attend(self) -> None:
+        ctx = self.context(random.choice(self.discord_ids))
+        mention = ctx.author.mention
+
+        # 출석은 대기열에서 처리되므로, 접수 안내가 아닌 결과 답장이 올 때까지 기다립니다.
+        # 같은 사용자의 요청은 하나로 합쳐져 마지막 요청의 채널로만 답장이 갑니다.
+        def is_result(message) -> bool:
+            return any(
+                part.startswith(mention) and "접수되었습니다" not in part
+                for part in (message.content or "").split("\n\n")
+            )
+
+        reply = asyncio.ensure_future(
+            self.bot.wait_for("bot_message", check=is_result, timeout=60.0)
+        )
+        await asyncio.sleep(0)
+        await invoke(self.user_cog, self.user_cog.attend, ctx)
+        await reply
+
+    async def unpack(self) -> None:
+        box = random.choice(list(user_ext.catalog.boxes.values()))
+        ctx = self.context(random.choice(self.discord_ids), {box.emoji, "⭕"})
+        await invoke(self.user_cog, self.user_cog.unpack_box, ctx)
+
+    async def deposit(self) -> None:
+        ctx = FakeContext(
+            self.bot, self.admin, self.guild, random.choice(self.channels), {"⭕"}
+        )
+        discord_id = random.choice(self.discord_ids)
+        user = await forte_ext.ForteUser().convert(ctx, str(discord_id))
+        await invoke(self.forte_cog, self.forte_cog.deposit, ctx, user, 100)
+
+    async def run_flow(self, name: str, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await getattr(self, name)()
+                outcome = "ok"
+            except Exception as e:
+                outcome = type(e).__name__
+            self.durations[name].append(time.perf_counter() - started)
+            self.outcomes[name][outcome] += 1
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, weight = part.split("=")
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+async def run(args: argparse.Namespace) -> dict:
+    random.seed(args.seed)
+    forte = FakeForte(
+        args.latency,
+        args.jitter,
+        args.error_rate,
+        args.unregistered_rate,
+        seed=args.seed,
+    )
+    runner, base_url = await start(forte)
+    api.base_url = base_url
+    api.throttle.rate = args.rate_limit
+    api.throttle.max_in_flight = args.max_in_flight
+    await api.open_session()
+    store.store.path = ":memory:"
+    await store.store.open()
+
+    harness = Harness(args)
+    harness.user_cog.attendances.throttle.rate = args.attendance_rate
+    mix = parse_mix(args.mix)
+    names = random.choices(list(mix), weights=list(mix.values()), k=args.flows)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(harness.run_flow(name, semaphore) for name in names))
+    finally:
+        elapsed = time.perf_counter() - started
+        harness.user_cog.cog_unload()
+        await api.close_session()
+        await ledger.ledger.close()
+        await store.store.close()
+        await runner.cleanup()
+
+    return {
+        "flows": args.flows,
+        "elapsed": elapsed,
+        "throughput": args.flows / elapsed,
+        "commands": {
+            name: {
+                "count": len(durations),
+                "p50": percentile(durations, 0.5),
+                "p95": percentile(durations, 0.95),
+                "p99": percentile(durations, 0.99),
+                "max": max(durations),
+                "outcomes": dict(harness.outcomes[name]),
+            }
+            for name, durations in sorted(harness.durations.items())
+        },
+        "upstream": dict(forte.requests.most_common()),
+        "upstream_total": sum(forte.requests.values()),
+        "injected_errors": forte.injected_errors,
+        "discord_messages": harness.bot.sent_count,
+        "throttle": api.throttle.stats(),
+        "user_cache": {"hits": api.user_cache.hits, "misses": api.user_cache.misses},
+        "key_cache": {"hits": api.key_cache.hits, "misses": api.key_cache.misses},
+        "attendance_merged": harness.user_cog.attendances.merged,
+        "ledger_written": ledger.ledger.written,
+    }
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"{report['flows']} flows in {report['elapsed']:.2f}s "
+        + f"({report['throughput']:.1f} flows/s)"
+    )
+    print()
+    print(f"{'command':<10}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name, stats in report["commands"].items():
+        print(
+            f"{name:<10}{stats['count']:>8}"
+            + "".join(
+                f"{1000 * stats[key]:>8.1f}ms" for key in ("p50", "p95", "p99", "max")
+            )
+        )
+        print(f"{'':<10}{stats['outcomes']}")
+    print()
+    print(f"upstream requests: {report['upstream_total']}")
+    for endpoint, count in report["upstream"].items():
+        print(f"  {endpoint:<40}{count:>8}")
+    print(f"injected errors: {report['injected_errors']}")
+    print(f"discord messages sent: {report['discord_messages']}")
+    print(f"throttle: {report['throttle']}")
+    print(f"user cache: {report['user_cache']}")
+    print(f"key cache: {report['key_cache']}")
+    print(f"merged attendances: {report['attendance_merged']}")
+    print(f"ledger entries: {report['ledger_written']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=str(__doc__).strip().splitlines()[0])
+    parser.add_argument("--flows", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--users", type=int, default=500, help="가상 사용자 수")
+    parser.add_argument("--channels", type=int, default=5)
+    parser.add_argument("--mix", default="attend=5,unpack=3,deposit=1")
+    parser.add_argument("--premium-rate", type=float, default=0.2)
+    parser.add_argument("--latency", type=float, default=0.02, help="FORTE 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--unregistered-rate", type=float, default=0.05)
+    parser.add_argument("--discord-latency", type=float, default=0.0)
+    parser.add_argument(
+        "--think-time", type=float, default=0.05, help="반응을 누르기까지 걸리는 시간(초)"
+    )
+    parser.add_argument("--rate-limit", type=float, default=api.throttle.rate)
+    parser.add_argument("--max-in-flight", type=int, default=api.throttle.max_in_flight)
+    parser.add_argument(
+        "--attendance-rate", type=float, default=0, help="출석 처리 속도 제한 (0이면 무제한)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력합니다.")
+    args = parser.parse_args()
+
+    report = asyncio.get_event_loop().run_until_complete(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+가짜 게이트웨이(fake_gateway)에 봇을 띄워, 모든 이벤트를 캐시하는 설정(LEAN_MEMORY=0)과
+메모리 절약 설정(LEAN_MEMORY=1)의 메모리 사용량(RSS)을 비교합니다.
+
+    $ python bench/memory.py --guilds 200 --members 500 --messages 20000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+import psutil
+from fake_gateway import FakeGateway, start
+from shards import read_health, wait_until
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+async def measure(args: argparse.Namespace, lean: bool) -> dict:
+    gateway = FakeGateway(args.guilds, members_per_guild=args.members)
+    runner, api_base = await start(gateway)
+    workdir = Path(tempfile.mkdtemp(prefix="lara-memory-"))
+    health_file = workdir / "lara.health"
+
+    env = dict(
+        os.environ,
+        DISCORD_API_BASE=api_base,
+        BOT_TOKEN="bench",
+        FORTE_TOKEN="bench",
+        LEAN_MEMORY="1" if lean else "0",
+        LARA_HEALTH_FILE=str(health_file),
+        LARA_LOG_FILE=str(workdir / "lara.log"),
+        LARA_STORE_PATH=str(workdir / "lara.db"),
+        IDENTIFY_LOCK_FILE=str(workdir / "lara.identify"),
+        GUILD_WHITELIST="1",
+        PREMIUM_ROLE="2",
+        SUBSCRIBER_ROLE="3",
+        ADMIN_ROLE="4",
+    )
+    env.pop("SHARD_COUNT", None)
+    bot = await asyncio.create_subprocess_exec(
+        sys.executable, str(ROOT / "src" / "bot.py"), cwd=str(ROOT), env=env
+    )
+    process = psutil.Process(bot.pid)
+    report: Dict[str, Any] = {"mode": "lean" if lean else "default"}
+    try:
+        def is_ready() -> bool:
+            return read_health(health_file).get("state") == "ready"
+
+        report["ready_seconds"] = await wait_until(is_ready, args.timeout)
+        report["rss_ready_mib"] = process.memory_info().rss / 2 ** 20
+
+        # 일반 대화 메시지를 보낸 뒤, 명령어 응답으로 모두 처리되었는지 확인합니다.
+        rng = random.Random(args.seed)
+        delivered = 0
+        for _ in range(args.messages):
+            guild = rng.choice(gateway.guilds)
+            author = int(guild["id"]) * 1000 + rng.randrange(max(args.members, 1))
+            delivered += await gateway.send_message(guild, author, "안녕하세요! " * 5)
+        report["messages_delivered"] = delivered
+
+        guild = gateway.guilds[0]
+        channel_id = int(guild["channels"][0]["id"])
+        await gateway.send_message(guild, 1, "라라야 help")
+        await wait_until(lambda: gateway.sent.get(channel_id), args.timeout)
+        await asyncio.sleep(1)
+        report["rss_after_messages_mib"] = process.memory_info().rss / 2 ** 20
+    finally:
+        if bot.returncode is None:
+            bot.send_signal(signal.SIGINT)
+        await bot.wait()
+        await runner.cleanup()
+    return report
+
+
+async def run(args: argparse.Namespace) -> dict:
+    return {
+        "guilds": args.guilds,
+        "members_per_guild": args.members,
+        "messages": args.messages,
+        "results": [await measure(args, lean=False), await measure(args, lean=True)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=str(__doc__).strip().splitlines()[0])
+    parser.add_argument("--guilds", type=int, default=100)
+    parser.add_argument("--members", type=int, default=200, help="서버당 멤버 수")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = asyncio.get_event_loop().run_until_complete(run(args))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
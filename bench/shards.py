@@ -0,0 +1,135 @@
+"""
+가짜 게이트웨이(fake_gateway)에 supervisor.py로 샤드 프로세스들을 띄워 샤딩 모드를 확인합니다.
+모든 샤드가 준비될 때까지의 시간, 서버마다 명령어에 응답하는지, 프로세스 하나를 강제로 종료했을 때
+다시 시작되어 복구되는지, 같은 샤드가 동시에 두 번 접속한 적이 없는지를 출력합니다.
+
+    $ python bench/shards.py --guilds 200 --shards 8 --processes 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from fake_gateway import FakeGateway, start
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def read_health(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+async def wait_until(condition, timeout: float, interval: float = 0.1) -> float:
+    started = time.monotonic()
+    while not condition():
+        if time.monotonic() - started > timeout:
+            raise TimeoutError()
+        await asyncio.sleep(interval)
+    return time.monotonic() - started
+
+
+async def run(args: argparse.Namespace) -> dict:
+    gateway = FakeGateway(args.guilds)
+    runner, api_base = await start(gateway)
+    workdir = Path(tempfile.mkdtemp(prefix="lara-shards-"))
+    health_file = workdir / "lara.health"
+
+    env = dict(
+        os.environ,
+        DISCORD_API_BASE=api_base,
+        BOT_TOKEN="bench",
+        FORTE_TOKEN="bench",
+        SHARD_COUNT=str(args.shards),
+        SHARD_PROCESSES=str(args.processes),
+        IDENTIFY_INTERVAL=str(args.identify_interval),
+        IDENTIFY_LOCK_FILE=str(workdir / "lara.identify"),
+        LARA_HEALTH_FILE=str(health_file),
+        LARA_LOG_FILE=str(workdir / "lara.log"),
+        LARA_STORE_PATH=str(workdir / "lara.db"),
+        SHUTDOWN_DEADLINE="5",
+        SHARD_RESTART_MAX_DELAY="5",
+        GUILD_WHITELIST="1",
+        PREMIUM_ROLE="2",
+        SUBSCRIBER_ROLE="3",
+        ADMIN_ROLE="4",
+    )
+    supervisor = await asyncio.create_subprocess_exec(
+        sys.executable, str(ROOT / "src" / "supervisor.py"), cwd=str(ROOT), env=env
+    )
+    report: Dict[str, Any] = {"workdir": str(workdir)}
+    try:
+        def is_ready() -> bool:
+            return read_health(health_file).get("state") == "ready"
+
+        report["ready_seconds"] = await wait_until(is_ready, args.timeout)
+
+        # 모든 서버에 명령어를 보내고, 각 서버를 맡은 샤드가 응답하는지 확인합니다.
+        started = time.monotonic()
+        for guild in gateway.guilds:
+            await gateway.send_message(guild, 1000 + len(gateway.sent), "라라야 help")
+        channels = [int(guild["channels"][0]["id"]) for guild in gateway.guilds]
+
+        def answered() -> bool:
+            return all(gateway.sent.get(c) for c in channels)
+
+        await wait_until(answered, args.timeout)
+        report["replies_seconds"] = time.monotonic() - started
+
+        # 프로세스 하나를 강제로 종료하고 다시 준비될 때까지 기다립니다.
+        worker = read_health(health_file)["workers"]["0"]
+        identifies = {shard: len(gateway.identifies[shard]) for shard in worker["shards"]}
+        os.kill(worker["pid"], signal.SIGKILL)
+        await wait_until(lambda: not is_ready(), args.timeout)
+
+        def recovered() -> bool:
+            restarted = all(
+                len(gateway.identifies[shard]) > count
+                for shard, count in identifies.items()
+            )
+            return restarted and is_ready()
+
+        report["recovery_seconds"] = await wait_until(recovered, args.timeout)
+    finally:
+        if supervisor.returncode is None:
+            supervisor.send_signal(signal.SIGINT)
+        started = time.monotonic()
+        await supervisor.wait()
+        report["shutdown_seconds"] = time.monotonic() - started
+        await runner.cleanup()
+
+    report["supervisor_exit"] = supervisor.returncode
+    report["final_state"] = read_health(health_file).get("state")
+    report["identifies"] = {
+        shard: len(times) for shard, times in sorted(gateway.identifies.items())
+    }
+    report["overlapping_sessions"] = gateway.overlaps
+    report["requests"] = dict(gateway.requests.most_common())
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=str(__doc__).strip().splitlines()[0])
+    parser.add_argument("--guilds", type=int, default=100)
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument(
+        "--identify-interval", type=float, default=0.2, help="IDENTIFY 간격(초)"
+    )
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    report = asyncio.get_event_loop().run_until_complete(run(args))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
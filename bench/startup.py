@@ -0,0 +1,171 @@
+"""
+봇의 시작 시간을 측정합니다. CI에서 실행해 시작 시간이 느려지지 않았는지 확인할 수 있습니다.
+
+- import: 모듈별 import 시간 (새 인터프리터에서 bot, 확장 순서로 import)
+- ready: 가짜 게이트웨이(fake_gateway)에 봇을 띄워 상태 파일이 ready가 될 때까지의 시간
+- first_command, reload: 준비된 뒤 첫 명령어와 `reload user` 명령어의 응답 시간
+
+확장을 처음 필요할 때 불러오는 설정(LAZY_EXTENSIONS=1)과 모두 미리 불러오는 설정을 비교하며,
+--max-ready 또는 --max-import를 넘으면 0이 아닌 값으로 종료합니다.
+
+    $ python bench/startup.py --repeat 5 --max-ready 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fake_gateway import FakeGateway, start
+from shards import read_health, wait_until
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# 앞의 모듈이 불러온 의존성은 다음 모듈의 시간에 포함되지 않습니다.
+import_modules = [
+    "config",
+    "api",
+    "bot",
+    "extensions.user",
+    "extensions.forte",
+    "extensions.admin",
+]
+import_script = """
+import json, sys, time
+sys.path.insert(0, "src")
+timings = {}
+for name in sys.argv[1:]:
+    started = time.perf_counter()
+    __import__(name)
+    timings[name] = time.perf_counter() - started
+print(json.dumps(timings))
+"""
+
+
+def environment(workdir: Path, api_base: str = "", lazy: bool = True) -> dict:
+    env = dict(
+        os.environ,
+        DISCORD_API_BASE=api_base,
+        BOT_TOKEN="bench",
+        FORTE_TOKEN="bench",
+        LAZY_EXTENSIONS="1" if lazy else "0",
+        LARA_HEALTH_FILE=str(workdir / "lara.health"),
+        LARA_LOG_FILE=str(workdir / "lara.log"),
+        LARA_STORE_PATH=str(workdir / "lara.db"),
+        IDENTIFY_LOCK_FILE=str(workdir / "lara.identify"),
+        GUILD_WHITELIST="1",
+        PREMIUM_ROLE="2",
+        SUBSCRIBER_ROLE="3",
+        ADMIN_ROLE="4",
+    )
+    env.pop("SHARD_COUNT", None)
+    return env
+
+
+def measure_imports(workdir: Path) -> dict:
+    output = subprocess.check_output(
+        [sys.executable, "-c", import_script, *import_modules],
+        cwd=str(ROOT),
+        env=environment(workdir),
+    )
+    return json.loads(output)
+
+
+async def reply_seconds(gateway: FakeGateway, content: str, timeout: float) -> float:
+    # 봇 소유자(fake_gateway의 애플리케이션 소유자 ID 1)로 명령어를 보냅니다.
+    guild = gateway.guilds[0]
+    channel_id = int(guild["channels"][0]["id"])
+    count = len(gateway.sent[channel_id])
+    started = time.monotonic()
+    await gateway.send_message(guild, 1, content)
+    await wait_until(lambda: len(gateway.sent[channel_id]) > count, timeout, 0.01)
+    return time.monotonic() - started
+
+
+async def measure_bot(args: argparse.Namespace, lazy: bool) -> dict:
+    gateway = FakeGateway(args.guilds)
+    runner, api_base = await start(gateway)
+    workdir = Path(tempfile.mkdtemp(prefix="lara-startup-"))
+    health_file = workdir / "lara.health"
+
+    started = time.monotonic()
+    bot = await asyncio.create_subprocess_exec(
+        sys.executable,
+        str(ROOT / "src" / "bot.py"),
+        cwd=str(ROOT),
+        env=environment(workdir, api_base, lazy),
+    )
+    report = {}
+    try:
+        def is_ready() -> bool:
+            return read_health(health_file).get("state") == "ready"
+
+        await wait_until(is_ready, args.timeout, 0.01)
+        report["ready"] = time.monotonic() - started
+        report["first_command"] = await reply_seconds(
+            gateway, "라라야 uptime", args.timeout
+        )
+        report["reload"] = await reply_seconds(
+            gateway, "라라야 reload user", args.timeout
+        )
+    finally:
+        if bot.returncode is None:
+            bot.send_signal(signal.SIGINT)
+        await bot.wait()
+        await runner.cleanup()
+    return report
+
+
+def median(samples: list) -> dict:
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+async def run(args: argparse.Namespace) -> dict:
+    workdir = Path(tempfile.mkdtemp(prefix="lara-startup-"))
+    imports = median([measure_imports(workdir) for _ in range(args.repeat)])
+    report = {
+        "repeat": args.repeat,
+        "import": imports,
+        "import_total": sum(imports.values()),
+    }
+    for lazy in (True, False):
+        samples = [await measure_bot(args, lazy) for _ in range(args.repeat)]
+        report["lazy" if lazy else "eager"] = median(samples)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=str(__doc__).strip().splitlines()[0])
+    parser.add_argument("--guilds", type=int, default=10)
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="반복 횟수 (중앙값을 출력합니다)"
+    )
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument(
+        "--max-ready", type=float, help="ready까지 허용하는 최대 시간(초)"
+    )
+    parser.add_argument(
+        "--max-import", type=float, help="import에 허용하는 최대 시간(초)"
+    )
+    args = parser.parse_args()
+
+    report = asyncio.get_event_loop().run_until_complete(run(args))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    failures = []
+    if args.max_ready is not None and report["lazy"]["ready"] > args.max_ready:
+        failures.append(f"ready took {report['lazy']['ready']:.2f}s")
+    if args.max_import is not None and report["import_total"] > args.max_import:
+        failures.append(f"import took {report['import_total']:.2f}s")
+    if failures:
+        sys.exit("startup is too slow: " + ", ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
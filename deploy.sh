@@ -2,10 +2,56 @@
 set -e
 
 WORKSPACE=$(pwd)
-PID=$(ps -ef | grep "[p]ython3 ${WORKSPACE}/src/bot.py" | awk '{ print $2 }')
+# 샤드를 여러 프로세스로 나누어 실행하려면 LARA_ENTRYPOINT=src/supervisor.py로 지정합니다.
+ENTRYPOINT="${WORKSPACE}/${LARA_ENTRYPOINT:-src/bot.py}"
+HEALTH_FILE="${LARA_HEALTH_FILE:-${WORKSPACE}/lara.health}"
+# 봇의 SHUTDOWN_DEADLINE보다 넉넉하게 기다립니다.
+STOP_TIMEOUT=${STOP_TIMEOUT:-60}
+READY_TIMEOUT=${READY_TIMEOUT:-60}
 
+health() {
+  python3 -c "import json, sys; print(json.load(open(sys.argv[1]))[sys.argv[2]])" "$HEALTH_FILE" "$1" 2>/dev/null || true
+}
+
+# 상태 파일의 pid는 정상 종료(stopped)되지 않았고, 같은 진입점을 실행 중인 프로세스일 때만 믿습니다.
+# 종료된 봇의 pid가 다른 프로세스에 재사용되었을 수 있기 때문입니다.
+PID=""
+if [ "$(health state)" != "stopped" ]; then
+  PID=$(health pid)
+  case "$(ps -p "${PID:-0}" -o args= 2>/dev/null)" in
+    *"${ENTRYPOINT}"*) ;;
+    *) PID="" ;;
+  esac
+fi
+if [ -z "$PID" ]; then
+  PID=$(ps -ef | grep "[p]ython3 ${ENTRYPOINT}" | awk '{ print $2 }')
+fi
+
+# 이전 프로세스가 실행 중인 명령어를 마치고 완전히 종료된 뒤에 새 프로세스를 시작합니다.
+# 두 프로세스가 동시에 명령어를 받으면 포인트 지급이 중복될 수 있기 때문입니다.
 if [ ! -z "$PID" ]; then
   echo "$PID" | xargs kill -s SIGINT
+  WAITED=0
+  while echo "$PID" | xargs kill -0 2>/dev/null; do
+    if [ "$WAITED" -ge "$STOP_TIMEOUT" ]; then
+      echo "bot ($PID) did not stop in ${STOP_TIMEOUT}s" >&2
+      exit 1
+    fi
+    sleep 1
+    WAITED=$((WAITED + 1))
+  done
 fi
 
-nohup python3 "${WORKSPACE}/src/bot.py" &
+rm -f "$HEALTH_FILE"
+nohup python3 "${ENTRYPOINT}" &
+
+WAITED=0
+until [ "$(health state)" = "ready" ]; do
+  if [ "$WAITED" -ge "$READY_TIMEOUT" ]; then
+    echo "bot did not become ready in ${READY_TIMEOUT}s (state: $(health state))" >&2
+    exit 1
+  fi
+  sleep 1
+  WAITED=$((WAITED + 1))
+done
+echo "bot is ready (pid $(health pid))"
@@ -1,35 +1,499 @@
+import asyncio
 import logging
-import os
-from typing import Tuple
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 
 import aiohttp
-from dotenv import load_dotenv
+import jsonstream
+import metrics
+from cache import TTLCache
+from config import config
+from resilience import CircuitBreakers, CircuitOpen, RetryPolicy
+from throttle import Throttle, ThrottleTimeout
 
-load_dotenv(verbose=True, override=True)
-base_url = os.getenv("FORTE_BASE_URL")
-token = os.getenv("FORTE_TOKEN")
+settings = config.api
+base_url = settings.base_url
+token = settings.token
+
+# 커넥션 풀 설정
+pool_limit = settings.pool_limit
+pool_limit_per_host = settings.pool_limit_per_host
+dns_cache_ttl = settings.dns_cache_ttl
+keepalive_timeout = settings.keepalive_timeout
+connect_timeout = settings.connect_timeout
+request_timeout = settings.request_timeout
+
+# 사용자 정보 캐시 설정
+user_cache_size = settings.user_cache_size
+user_cache_ttl = settings.user_cache_ttl
+user_cache_negative_ttl = settings.user_cache_negative_ttl
+key_cache_ttl = settings.key_cache_ttl
+
+# 요청 속도 제한 설정
+rate_limit = settings.rate_limit
+rate_burst = settings.rate_burst
+max_in_flight = settings.max_in_flight
+queue_timeout = settings.queue_timeout
+
+# 재시도 및 서킷 브레이커 설정
+retry_attempts = settings.retry_attempts
+retry_base_delay = settings.retry_base_delay
+retry_max_delay = settings.retry_max_delay
+breaker_threshold = settings.breaker_threshold
+breaker_reset_timeout = settings.breaker_reset_timeout
+
+# 응답 디코딩 설정
+loads = jsonstream.loader(settings.json_backend)
+stream_chunk_size = settings.stream_chunk_size
 
 logger = logging.getLogger("lara.api")
 
+# 조회처럼 여러 번 보내도 결과가 같은 요청에만 사용합니다.
+idempotent_retry = RetryPolicy(retry_attempts, retry_base_delay, retry_max_delay)
+breakers = CircuitBreakers(breaker_threshold, breaker_reset_timeout)
+throttle = Throttle(rate_limit, rate_burst, max_in_flight, queue_timeout)
+
+metrics.registry.register(
+    metrics.Gauge(
+        "lara_forte_throttle",
+        "FORTE 요청 대기열 상태 (대기 시간은 초 단위)",
+        ["stat"],
+        lambda: {(key,): value for key, value in throttle.stats().items()},
+    )
+)
+metrics.registry.register(
+    metrics.Gauge(
+        "lara_forte_circuit_open",
+        "FORTE 엔드포인트별 서킷 브레이커 열림 여부",
+        ["breaker"],
+        lambda: {
+            (key,): int(breaker.state != breaker.CLOSED)
+            for key, breaker in breakers.breakers.items()
+        },
+    )
+)
+
+# ("discord", 디스코드 ID), ("user", 사용자 ID) 두 가지 키로 같은 사용자 정보를 저장하고,
+# ("link", 사용자 ID) 키에는 연결된 디스코드 ID를 저장합니다.
+user_cache = TTLCache(user_cache_size, user_cache_ttl)
+metrics.registry.register(
+    metrics.Gauge(
+        "lara_forte_user_cache",
+        "FORTE 사용자 정보 캐시 상태",
+        ["stat"],
+        lambda: {
+            ("size",): len(user_cache),
+            ("hits",): user_cache.hits,
+            ("misses",): user_cache.misses,
+        },
+    )
+)
+# 디스코드 ID -> 보유한 열쇠 개수
+# 출석과 상자 열기 응답으로 갱신하며, 실제 차감은 항상 FORTE가 판단합니다.
+key_cache = TTLCache(user_cache_size, key_cache_ttl)
+metrics.registry.register(
+    metrics.Gauge(
+        "lara_forte_key_cache",
+        "열쇠 개수 캐시 상태",
+        ["stat"],
+        lambda: {
+            ("size",): len(key_cache),
+            ("hits",): key_cache.hits,
+            ("misses",): key_cache.misses,
+        },
+    )
+)
+# 디스코드 ID -> 진행 중인 열쇠 개수 조회의 식별 객체
+# 조회 도중 열쇠 개수가 바뀌면 항목을 지워, 이전 값이 캐시에 들어가지 않게 합니다.
+key_fetches: Dict[str, object] = {}
+user_endpoint_pattern = re.compile(r"^/(users|discords)/(\d+)")
+id_segment_pattern = re.compile(r"/\d+(?=/|$)")
+_miss = object()
+
+# 진행 중인 GET 요청 (엔드포인트 -> 요청 Task)
+inflight: Dict[str, asyncio.Future] = {}
+
+# ("discord", 디스코드 ID) 또는 ("user", 사용자 ID) -> 마지막으로 정보가 변경된 시각
+# 조회 도중 해당 사용자의 정보가 바뀌었다면 결과를 캐시하지 않습니다. 다른 사용자의 변경은 영향을 주지 않습니다.
+user_changes: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+# 조회 하나가 걸릴 수 있는 최대 시간입니다. 이보다 오래된 변경 기록은 지우고,
+# 이보다 오래 걸린 조회는 도중에 바뀌었는지 알 수 없으므로 캐시하지 않습니다.
+user_change_horizon = queue_timeout + retry_attempts * (request_timeout + retry_max_delay)
+
+session: Optional[aiohttp.ClientSession] = None
+
+
+class ForteError(Exception):
+    """
+    FORTE API 요청 자체를 처리하지 못했을 때 발생합니다.
+    예외 메시지는 사용자에게 그대로 보여줄 수 있는 문장입니다.
+    """
+
+    default_message = "🔥 에러가 발생했습니다. 잠시 후 다시 시도해주세요."
+
+    def __init__(self, message: Optional[str] = None) -> None:
+        super().__init__(message or self.default_message)
+
+
+class ForteBusy(ForteError):
+    default_message = "⏳ 요청이 많아 처리가 지연되고 있습니다. 잠시 후 다시 시도해주세요."
+
+
+class ForteUnavailable(ForteError):
+    default_message = "🔥 FORTE 서버에 연결할 수 없습니다. 잠시 후 다시 시도해주세요."
+
+
+class ForteCircuitOpen(ForteUnavailable):
+    """
+    서킷 브레이커가 열려 있어 요청을 보내지 않고 포기했을 때 발생합니다.
+    """
+
+
+def template(endpoint: str) -> str:
+    """
+    경로에 포함된 ID를 `{id}`로 바꾼 엔드포인트 이름을 반환합니다.
+    """
+    return id_segment_pattern.sub("/{id}", endpoint.split("?", 1)[0])
+
+
+async def open_session() -> aiohttp.ClientSession:
+    """
+    FORTE API 호출에 사용할 공용 세션을 생성합니다.
+    봇이 시작될 때 한 번 호출되며, 이미 열려 있는 경우 기존 세션을 반환합니다.
+    """
+    global session
+    if session is not None and not session.closed:
+        return session
 
-async def request(method, endpoint, **kwargs):
-    async with aiohttp.request(
-        method,
-        base_url + endpoint,
+    connector = aiohttp.TCPConnector(
+        limit=pool_limit,
+        limit_per_host=pool_limit_per_host,
+        ttl_dns_cache=dns_cache_ttl,
+        keepalive_timeout=keepalive_timeout,
+    )
+    session = aiohttp.ClientSession(
+        connector=connector,
         headers={"Authorization": token, "accept": "application/json"},
-        **kwargs,
-    ) as resp:
-        logger.info(f'{method.lower()} "{endpoint}" {resp.status}')
-        return await resp.json(), resp
+        timeout=aiohttp.ClientTimeout(total=request_timeout, connect=connect_timeout),
+    )
+    return session
+
+
+async def close_session() -> None:
+    global session
+    if session is not None:
+        await session.close()
+        session = None
+
+
+def dump_caches() -> dict:
+    """
+    재시작 후에 바로 쓸 수 있도록 사용자 정보와 열쇠 개수 캐시를 JSON으로 바꿀 수 있는 형태로 반환합니다.
+    """
+    return {"users": user_cache.dump(), "keys": key_cache.dump()}
+
+
+def load_caches(data: dict) -> int:
+    # JSON에서는 튜플 키가 리스트로 바뀌므로 되돌립니다.
+    loaded = user_cache.load(
+        [(tuple(key), value, expires_at) for key, value, expires_at in data["users"]]
+    )
+    return loaded + key_cache.load(data["keys"])
+
+
+Decoder = Callable[[aiohttp.ClientResponse], Awaitable[Any]]
+
+
+def stream_list(predicate: Callable[[Any], bool]) -> Decoder:
+    """
+    목록 응답을 받는 대로 디코딩하면서 predicate를 통과한 원소만 남기는 decode 함수를 만듭니다.
+    응답이 목록이 아니면(에러 응답 등) 본문 전체를 디코딩한 결과를 그대로 반환합니다.
+
+        result, resp = await request("get", endpoint, decode=stream_list(is_refundable))
+    """
+
+    async def decode(resp: aiohttp.ClientResponse) -> Any:
+        return await jsonstream.read_array(resp, predicate, stream_chunk_size)
+
+    return decode
 
 
-async def get_key_count(discord_id: int) -> int:
+async def request(
+    method,
+    endpoint,
+    retry: Optional[RetryPolicy] = None,
+    decode: Optional[Decoder] = None,
+    **kwargs,
+):
+    """
+    FORTE API를 호출하고 (응답 본문, 응답 객체) 튜플을 반환합니다.
+    동시에 들어온 같은 GET 요청은 하나의 호출로 합쳐서 결과를 공유합니다.
+    retry 정책은 GET 요청에만 적용됩니다.
+
+    decode를 지정하면 응답 본문을 그 함수로 디코딩합니다.
+    호출자마다 결과가 다를 수 있으므로 이때는 같은 GET 요청이라도 결과를 공유하지 않습니다.
+    """
+    if method.lower() != "get" or kwargs or decode is not None:
+        return await _send(method, endpoint, retry=retry, decode=decode, **kwargs)
+
+    task = inflight.get(endpoint)
+    if task is None:
+        task = asyncio.ensure_future(_send(method, endpoint, retry=retry))
+        inflight[endpoint] = task
+        task.add_done_callback(lambda t: _forget_inflight(endpoint, t))
+
+    # 대기 중인 호출자 하나가 취소되더라도 공유 중인 요청은 취소하지 않습니다.
+    return await asyncio.shield(task)
+
+
+def _forget_inflight(endpoint: str, task: asyncio.Future) -> None:
+    if inflight.get(endpoint) is task:
+        del inflight[endpoint]
+
+
+async def _send(
+    method,
+    endpoint,
+    retry: Optional[RetryPolicy] = None,
+    decode: Optional[Decoder] = None,
+    **kwargs,
+):
+    if method.lower() != "get":
+        retry = None
+    breaker = breakers.get(f"{method.upper()} {template(endpoint)}")
+
+    attempt = 0
+    while True:
+        try:
+            breaker.before_request()
+        except CircuitOpen:
+            logger.warning(f'{method.lower()} "{endpoint}" rejected, circuit open')
+            raise ForteCircuitOpen()
+
+        try:
+            result, resp = await _send_once(method, endpoint, decode, **kwargs)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            breaker.record_failure()
+            if retry is None or attempt + 1 >= retry.attempts:
+                raise ForteUnavailable() from e
+            logger.info(f'{method.lower()} "{endpoint}" retry, {e!r}')
+        except BaseException:
+            breaker.release()
+            raise
+        else:
+            if resp.status >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+            if (
+                retry is None
+                or resp.status not in retry.retry_statuses
+                or attempt + 1 >= retry.attempts
+            ):
+                return result, resp
+            logger.info(f'{method.lower()} "{endpoint}" retry, {resp.status}')
+
+        await asyncio.sleep(retry.delay(attempt))
+        attempt += 1
+
+
+async def _send_once(method, endpoint, decode: Optional[Decoder] = None, **kwargs):
+    if session is None:
+        raise RuntimeError("FORTE session is not opened")
+
+    try:
+        async with throttle.slot():
+            status = "error"
+            started = time.perf_counter()
+            try:
+                async with session.request(
+                    method, base_url + endpoint, **kwargs
+                ) as resp:
+                    status = str(resp.status)
+                    if decode is None:
+                        body = await jsonstream.read_json(resp, loads)
+                    else:
+                        body = await decode(resp)
+                    return body, resp
+            finally:
+                duration = time.perf_counter() - started
+                logger.info(
+                    f'{method.lower()} "{endpoint}" {status}',
+                    extra={
+                        "method": method.lower(),
+                        "endpoint": template(endpoint),
+                        "status": status,
+                        "duration": round(duration, 4),
+                    },
+                )
+                metrics.observe_forte_request(
+                    method.lower(), template(endpoint), status, duration
+                )
+                if method.lower() != "get":
+                    _invalidate_endpoint(endpoint)
+    except ThrottleTimeout:
+        logger.warning(
+            f'{method.lower()} "{endpoint}" rejected, waiting = {throttle.waiting}'
+        )
+        raise ForteBusy()
+
+
+def _invalidate_endpoint(endpoint: str) -> None:
+    match = user_endpoint_pattern.match(endpoint)
+    if match:
+        kind, key = match.groups()
+        invalidate_user(
+            user_id=key if kind == "users" else None,
+            discord_id=key if kind == "discords" else None,
+        )
+
+
+def invalidate_user(user_id=None, discord_id=None) -> None:
+    """
+    사용자 정보 캐시에서 해당 사용자를 제거합니다.
+    디스코드 ID 또는 사용자 ID 중 하나만 주어져도 연결된 항목을 함께 제거합니다.
+    """
+    changed: List[Tuple[str, str]] = []
+    if discord_id is not None:
+        changed.append(("discord", str(discord_id)))
+        user = user_cache.pop(("discord", str(discord_id)))
+        if isinstance(user, dict) and "id" in user:
+            user_id = user["id"]
+
+    if user_id is not None:
+        user_cache.pop(("user", str(user_id)))
+        linked_discord_id = user_cache.pop(("link", str(user_id)))
+        if linked_discord_id is not None:
+            user_cache.pop(("discord", linked_discord_id))
+            discord_id = linked_discord_id
+            changed.append(("discord", linked_discord_id))
+        changed.append(("user", str(user_id)))
+
+    if discord_id is not None:
+        key_cache.pop(str(discord_id))
+        key_fetches.pop(str(discord_id), None)
+    _record_changes(changed)
+
+    # 변경 이전에 시작된 GET 요청은 이후 호출자와 공유하지 않습니다.
+    targets = {("users", str(user_id)), ("discords", str(discord_id))}
+    for endpoint in list(inflight):
+        match = user_endpoint_pattern.match(endpoint)
+        if match and match.groups() in targets:
+            del inflight[endpoint]
+
+
+def _record_changes(keys: List[Tuple[str, str]]) -> None:
+    now = time.monotonic()
+    for key in keys:
+        # 변경 시각 순서를 유지하도록 기존 기록을 지우고 맨 뒤에 추가합니다.
+        user_changes.pop(key, None)
+        user_changes[key] = now
+    while user_changes:
+        key = next(iter(user_changes))
+        if user_changes[key] > now - user_change_horizon:
+            break
+        user_changes.popitem(last=False)
+
+
+def _changed_since(started: float, *keys: Tuple[str, str]) -> bool:
+    """
+    started 이후에 keys 중 하나라도 정보가 변경되었을 수 있으면 참을 반환합니다.
+    """
+    if time.monotonic() - started >= user_change_horizon:
+        return True
+    return any(user_changes.get(key, started - 1) >= started for key in keys)
+
+
+def _changed_keys(user: Any, *keys: Tuple[str, str]) -> Tuple[Tuple[str, str], ...]:
+    if isinstance(user, dict) and "id" in user:
+        return keys + (("user", str(user["id"])),)
+    return keys
+
+
+async def get_discord_user(discord_id: Union[int, str]) -> dict:
+    """
+    디스코드 ID로 FORTE 사용자 정보를 조회합니다.
+    가입하지 않은 계정인 경우 "id" 키가 없는 결과를 반환합니다.
+    """
+    key = ("discord", str(discord_id))
+    user = user_cache.get(key, _miss)
+    if user is not _miss:
+        return user
+
+    started = time.monotonic()
+    user, resp = await request("get", f"/discords/{discord_id}", retry=idempotent_retry)
+    if _changed_since(started, *_changed_keys(user, key)):
+        return user
+    if isinstance(user, dict) and "id" in user:
+        _cache_user(user, discord_id=str(discord_id))
+    elif resp.status < 500:
+        user_cache.set(key, user, ttl=user_cache_negative_ttl)
+    return user
+
+
+async def get_user(user_id: Union[int, str]) -> Any:
+    """
+    FORTE 사용자 ID로 사용자 정보를 조회합니다.
+    존재하지 않는 사용자인 경우 dict가 아닌 결과를 반환합니다.
+    """
+    key = ("user", str(user_id))
+    user = user_cache.get(key, _miss)
+    if user is not _miss:
+        return user
+
+    started = time.monotonic()
+    user, resp = await request("get", f"/users/{user_id}", retry=idempotent_retry)
+    if _changed_since(started, key):
+        return user
+    if isinstance(user, dict) and "id" in user:
+        _cache_user(user)
+    elif resp.status < 500:
+        user_cache.set(key, user, ttl=user_cache_negative_ttl)
+    return user
+
+
+def _cache_user(user: dict, discord_id: Optional[str] = None) -> None:
+    user_id = str(user["id"])
+    user_cache.set(("user", user_id), user)
+    if discord_id is not None:
+        user_cache.set(("discord", discord_id), user)
+        user_cache.set(("link", user_id), discord_id)
+
+
+async def get_key_count(discord_id: int, fresh: bool = False) -> int:
     """
     사용자가 보유한 열쇠 개수를 반환합니다.
     포르테에 가입하지 않았거나 출석 기록이 없는 경우 0을 반환합니다.
+
+    최근 출석이나 상자 열기 응답으로 알게 된 값이 있으면 요청 없이 반환합니다.
+    다만 캐시된 값이 0이면 사용자를 돌려보내기 전에 FORTE에서 다시 확인합니다.
+    fresh가 참이면 캐시를 무시하고 FORTE에서 다시 조회해 캐시를 맞춥니다.
     """
-    result, _ = await request("get", f"/discords/{discord_id}/attendances")
-    return result.get("key_count", 0)
+    key = str(discord_id)
+    if not fresh:
+        key_count = key_cache.get(key, _miss)
+        if key_count is not _miss and key_count > 0:
+            return key_count
+
+    fetch = key_fetches[key] = object()
+    try:
+        result, resp = await request(
+            "get", f"/discords/{discord_id}/attendances", retry=idempotent_retry
+        )
+    finally:
+        current = key_fetches.pop(key, None)
+
+    key_count = result.get("key_count", 0)
+    if current is fetch and resp.status < 500:
+        key_cache.set(key, key_count)
+    return key_count
+
+
+# 한 사용자가 가질 수 있는 열쇠의 최대 개수
+max_key_count = 10
 
 
 class AttendanceError(Exception):
@@ -57,12 +521,14 @@ async def post_attendace(discord_id: int) -> int:
             f"최근에 이미 출석체크 하셨습니다.\n`{attendance.get('diff')}` 후 다시 시도해주세요.",
         )
     elif status == "max_key_count":
+        key_cache.set(str(discord_id), max_key_count)
         raise AttendanceError(
             logging.INFO,
             "max_key_count",
             "열쇠는 최대 10개까지 가질 수 있습니다.\n`라라야 상자` 명령어를 입력해 열쇠를 사용해주세요.",
         )
 
+    key_cache.set(str(discord_id), attendance["key_count"])
     return attendance["key_count"]
 
 
@@ -83,6 +549,7 @@ async def unpack_box(
     )
 
     if resp.status == 200:
+        key_cache.set(str(discord_id), result["key_count"])
         return result["point"], result["key_count"]
     elif resp.status in (400, 404):
         raise AttendanceError(logging.INFO, "insufficient_key", "상자를 열기에 충분한 열쇠가 없습니다.")
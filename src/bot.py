@@ -1,35 +1,298 @@
+import asyncio
 import json
 import logging
-import logging.config
 import os
+import signal
+import time
+from typing import TYPE_CHECKING, Any, Dict
 
+import api
+import cooldown
+import discord
+import interface
+import logconfig
+import metrics
+import sharding
+from config import config
 from discord.ext import commands
-from dotenv import load_dotenv
+from discord.http import Route
+from ledger import ledger
+from store import store
 
-with open("logging.json") as f:
-    logging.config.dictConfig(json.load(f))
+logger = logging.getLogger("lara")
+settings = config.bot
 
+# 샤드 설정. SHARD_COUNT가 없으면 샤딩 없이 실행합니다.
+shard_ids = sharding.parse_shard_ids(settings.shard_ids)
+identify_gate = sharding.IdentifyGate(
+    settings.identify_lock_file, settings.identify_interval
+)
+snapshot_name = "forte_caches"
+if shard_ids is not None:
+    snapshot_name += f":{sharding.format_shard_ids(shard_ids)}"
+    # 같은 저장소 파일을 쓰는 다른 샤드 프로세스의 작업을 복구하지 않도록 구분합니다.
+    store.owner = sharding.format_shard_ids(shard_ids)
 
-logger = logging.getLogger("lara")
-load_dotenv()
+if TYPE_CHECKING:
+    # 타입 검사에서는 믹스인이 commands.Bot의 속성을 쓸 수 있도록 합니다.
+    MixinBase = commands.Bot
+else:
+    MixinBase = object
 
 
-class LaraBot(commands.Bot):
-    extension_list = ["extensions.user", "extensions.admin", "extensions.forte"]
+class LaraBotMixin(MixinBase):
+    """
+    샤딩 여부와 관계없이 LaraBot과 ShardedLaraBot이 공유하는 동작입니다.
+    commands.Bot 또는 commands.AutoShardedBot보다 앞에 상속해야 합니다.
+    """
+
+    extension_list = ["extensions.user"]
+    # 자주 쓰이지 않는 확장과, 처음 호출될 때 그 확장을 불러오는 명령어 이름(별칭 포함)
+    lazy_extension_list = {
+        "extensions.forte": ("forte", "포르테", "ㅍ"),
+        "extensions.admin": ("reload", "uptime", "metrics", "memory"),
+    }
 
     async def on_ready(self):
         logger.info(f"Logged in as {self.user}")
+        if not self.draining:
+            self.write_health("ready")
+        # 준비를 늦추지 않도록, 명령어가 호출되지 않은 확장은 준비가 끝난 뒤에 불러옵니다.
+        self.loop.call_soon(self.load_lazy_extensions, list(self.lazy_extension_list))
 
     async def on_error(self, event, *args, **kwargs):
         logger.exception("")
 
-    def __init__(self):
-        super().__init__(commands.when_mentioned_or("라라야 ", "라라 ", "ㄹ ", "lara "))
+    def load_lazy_extensions(self, names) -> bool:
+        """
+        아직 불러오지 않은 확장을 불러오고, 새로 불러온 확장이 있는지 반환합니다.
+        """
+        loaded = False
+        for name in names:
+            if name in self.extensions:
+                continue
+            started = time.perf_counter()
+            self.load_extension(name)
+            logger.info(f"loaded {name} in {time.perf_counter() - started:.3f}s")
+            loaded = True
+        return loaded
+
+    async def get_context(self, message, *, cls=commands.Context):
+        ctx = await super().get_context(message, cls=cls)
+        names = self.lazy_commands.get(ctx.invoked_with)
+        if names and self.load_lazy_extensions(names):
+            ctx = await super().get_context(message, cls=cls)
+        return ctx
+
+    async def invoke(self, ctx):
+        if self.draining:
+            if ctx.command is not None:
+                await ctx.send(
+                    f"{ctx.author.mention}, 🔧 라라봇이 재시작하는 중입니다. 잠시 후 다시 시도해주세요."
+                )
+            return
+
+        task = asyncio.current_task()
+        self.in_flight.add(task)
+        if ctx.guild is not None:
+            sharding.shard_commands_total.inc(shard=str(ctx.guild.shard_id))
+        started = time.perf_counter()
+        try:
+            await super().invoke(ctx)
+        finally:
+            self.in_flight.discard(task)
+            if ctx.command is not None:
+                cooldown.cooldowns.release(ctx)
+                # 쿨다운에 걸려 실행하지 않은 명령어는 cooldown_total에만 기록합니다.
+                if not getattr(ctx, "cooldown_rejected", False):
+                    metrics.observe_command(
+                        ctx.command.qualified_name,
+                        ctx.command_failed,
+                        time.perf_counter() - started,
+                    )
+
+    async def check_cooldown(self, ctx):
+        """
+        모든 before_invoke 훅 중 마지막에 실행됩니다. 명령어의 check와 인자 변환을 통과한 뒤에 확인하므로,
+        실행되지 않을 명령어는 쿨다운 횟수를 쓰지 않습니다.
+        쿨다운에 걸린 명령어는 CooldownRejected를 발생시켜 답장 없이 무시합니다.
+        """
+        reason = cooldown.cooldowns.check(ctx)
+        if reason is not None:
+            ctx.cooldown_rejected = True
+            raise cooldown.CooldownRejected(reason)
+
+    def write_health(self, state: str) -> None:
+        """
+        배포 스크립트가 읽는 상태 파일을 갱신합니다.
+        state는 starting, ready, draining, stopped 중 하나입니다.
+        """
+        data = {"pid": os.getpid(), "state": state, "updated_at": time.time()}
+        temp_file = f"{settings.health_file}.tmp"
+        with open(temp_file, "w") as f:
+            json.dump(data, f)
+        os.replace(temp_file, settings.health_file)
+
+    def request_shutdown(self) -> None:
+        if self.shutdown_task is None:
+            logger.info("received shutdown signal")
+            self.shutdown_task = asyncio.ensure_future(self.shutdown())
+
+    async def shutdown(self) -> None:
+        """
+        새 명령어를 받지 않고, 실행 중인 명령어와 대기열의 작업이 끝나기를 최대
+        shutdown_deadline 초 동안 기다린 뒤 종료합니다.
+        """
+        self.draining = True
+        self.write_health("draining")
+        deadline = self.loop.time() + settings.shutdown_deadline
+
+        if self.in_flight:
+            logger.info(f"waiting for {len(self.in_flight)} commands to finish")
+            _, pending = await asyncio.wait(
+                set(self.in_flight), timeout=settings.shutdown_deadline
+            )
+            if pending:
+                logger.warning(f"{len(pending)} commands did not finish in time")
+
+        for name, cog in list(self.cogs.items()):
+            drain = getattr(cog, "drain", None)
+            if drain is None:
+                continue
+            try:
+                await asyncio.wait_for(drain(), max(deadline - self.loop.time(), 0))
+            except asyncio.TimeoutError:
+                logger.warning(f"{name} did not drain in time")
+
+        await self.close()
+
+    async def start(self, *args, **kwargs):
+        # discord.py가 설치한 핸들러는 이벤트 루프를 바로 멈추므로, 정리 작업을 거치도록 바꿉니다.
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self.loop.add_signal_handler(sig, self.request_shutdown)
+            except NotImplementedError:
+                pass
+
+        self.write_health("starting")
+        await api.open_session()
+        await store.open()
+        caches = await store.load_snapshot(snapshot_name)
+        if caches is not None:
+            logger.info(f"restored {api.load_caches(caches)} cache entries")
+        self.dispatch("store_ready")
+        if settings.metrics_port:
+            self.metrics_runner = await metrics.serve(
+                settings.metrics_host, settings.metrics_port
+            )
+        await super().start(*args, **kwargs)
+
+    async def close(self):
+        if self.metrics_runner is not None:
+            await self.metrics_runner.cleanup()
+            self.metrics_runner = None
+        await api.close_session()
+        if store.is_open:
+            await ledger.close()
+            await store.save_snapshot(snapshot_name, api.dump_caches())
+            await store.close()
+        await super().close()
+        self.write_health("stopped")
+
+    def __init__(self, **options):
+        super().__init__(
+            commands.when_mentioned_or("라라야 ", "라라 ", "ㄹ ", "lara "), **options
+        )
+        self.metrics_runner = None
+        self.draining = False
+        self.shutdown_task = None
+        # 실행 중인 명령어 처리 Task
+        self.in_flight = set()
+        self.before_invoke(self.check_cooldown)
+        interface.dispatcher.attach(self)
         for ext in self.extension_list:
             self.load_extension(ext)
 
+        # 명령어 이름 -> 불러와야 하는 확장 목록. 도움말에는 모든 명령어가 보여야 합니다.
+        self.lazy_commands = {"help": list(self.lazy_extension_list)}
+        for ext, names in self.lazy_extension_list.items():
+            for name in names:
+                self.lazy_commands[name] = [ext]
+        if not settings.lazy_extensions:
+            self.load_lazy_extensions(self.lazy_extension_list)
+
+
+class LaraBot(LaraBotMixin, commands.Bot):
+    pass
+
+
+class ShardedLaraBot(LaraBotMixin, commands.AutoShardedBot):
+    """
+    SHARD_IDS에 나열된 샤드들을 한 프로세스에서 실행합니다.
+    여러 프로세스로 나누어 실행하려면 supervisor.py를 사용하세요.
+    """
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        sharding.register_metrics(self)
+
+    async def before_identify_hook(self, shard_id, *, initial=False):
+        # 같은 머신의 다른 프로세스와 IDENTIFY 간격을 맞춥니다.
+        await identify_gate.wait()
+
+
+def cache_options() -> Dict[str, Any]:
+    """
+    게이트웨이 인텐트와 캐시 설정을 반환합니다.
+
+    명령어 처리에는 서버 목록과 채널, 역할(서버 이벤트), 메시지, 반응 이벤트만 필요합니다.
+    명령어를 보낸 멤버의 역할 정보는 메시지 이벤트에 포함되어 있으므로 멤버 목록을 캐시하지 않아도 되며,
+    반응과 메시지 대기는 raw 이벤트로 처리하므로 메시지 캐시도 필요하지 않습니다.
+    LEAN_MEMORY=0이면 이전처럼 모든 이벤트를 받고 멤버를 모두 캐시합니다.
+    (이 경우 개발자 포털에서 Privileged Gateway Intents를 켜야 합니다.)
+    """
+    max_messages = settings.max_messages
+    options: Dict[str, Any] = {
+        "max_messages": max_messages if max_messages > 0 else None
+    }
+    if not settings.lean_memory:
+        options["intents"] = discord.Intents.all()
+        options["member_cache_flags"] = discord.MemberCacheFlags.all()
+        return options
+
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.messages = True
+    intents.reactions = True
+    options["intents"] = intents
+    options["member_cache_flags"] = discord.MemberCacheFlags.none()
+    options["chunk_guilds_at_startup"] = False
+    return options
+
+
+def create_bot() -> commands.Bot:
+    options = cache_options()
+    options["guild_ready_timeout"] = settings.guild_ready_timeout
+    if settings.shard_count is None:
+        return LaraBot(**options)
+    if settings.shard_count == "auto":
+        return ShardedLaraBot(**options)
+    return ShardedLaraBot(
+        shard_count=int(settings.shard_count), shard_ids=shard_ids, **options
+    )
+
+
+def main():
+    logconfig.configure(settings.log_config, settings.log_file)
+    # 로컬 테스트용 가짜 게이트웨이를 사용할 때만 설정합니다.
+    if settings.discord_api_base:
+        # Route.BASE는 문자열 리터럴로 선언되어 있어 setattr로 바꿉니다.
+        setattr(Route, "BASE", settings.discord_api_base)
 
-bot = LaraBot()
+    bot = create_bot()
+    bot.run(settings.token)
+    logconfig.stop()
 
 
-bot.run(os.getenv("BOT_TOKEN"))
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+
+class TTLCache:
+    """
+    항목마다 만료 시각을 갖는 LRU 캐시입니다.
+    최대 크기를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _missing) is not _missing
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def dump(self) -> List[Tuple[Hashable, Any, float]]:
+        """
+        만료되지 않은 항목을 (키, 값, 만료 시각) 목록으로 반환합니다.
+        만료 시각은 다른 프로세스에서도 쓸 수 있도록 time.time() 기준입니다.
+        """
+        offset = time.time() - time.monotonic()
+        now = time.monotonic()
+        return [
+            (key, value, expires_at + offset)
+            for key, (expires_at, value) in self._data.items()
+            if expires_at > now
+        ]
+
+    def load(self, entries: List[Tuple[Hashable, Any, float]]) -> int:
+        """
+        dump()로 얻은 항목 중 아직 만료되지 않은 것을 추가하고, 추가한 개수를 반환합니다.
+        """
+        now = time.time()
+        loaded = 0
+        for key, value, expires_at in entries:
+            if expires_at > now:
+                self.set(key, value, ttl=min(expires_at - now, self.ttl))
+                loaded += 1
+        return loaded
+
+
+_missing = object()
@@ -0,0 +1,161 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from discord import Embed
+
+logger = logging.getLogger("lara.catalog")
+
+
+class Box:
+    """
+    box.json에 정의된 상자 하나입니다.
+    명령어를 처리할 때마다 반복되는 계산과 문자열 조립을 미리 해 둡니다.
+    """
+
+    def __init__(self, key: str, data: dict) -> None:
+        self.key = key
+        self.name = _require(data, "name", str, key)
+        self.image = _require(data, "image", str, key)
+        self.emoji = _require(data, "emoji", str, key)
+        self.required_keys = {
+            False: _require(data, "key", int, key),
+            True: data.get("key_premium", data["key"]),
+        }
+        if not isinstance(self.required_keys[True], int):
+            raise ValueError(f"box '{key}': 'key_premium' must be int")
+
+        probabilities = _require(data, "probabilities", list, key)
+        if not probabilities:
+            raise ValueError(f"box '{key}': 'probabilities' is empty")
+        for prob in probabilities:
+            _require(prob, "prob", (int, float), key)
+            _require(prob, "point", int, key)
+        if abs(sum(prob["prob"] for prob in probabilities) - 1) > 1e-6:
+            raise ValueError(f"box '{key}': probabilities do not sum to 1")
+
+        self.probabilities = probabilities
+        self.max_point = max(prob["point"] for prob in probabilities)
+
+        self.menu_line = {
+            is_premium: f"{self.emoji} **{self.name}** "
+            + f"(열쇠 {self.required_keys[is_premium]}개 필요, 최대 {self.max_point}P)"
+            for is_premium in (False, True)
+        }
+
+        # 필요 열쇠량
+        description = f"열쇠 {data['key']}개 필요"
+        if "key_premium" in data:
+            description += f" (프리미엄: {data['key_premium']}개 필요)"
+
+        # 확률 분포
+        description += "\n\n이 상자를 열면..\n"
+        description += "\n".join(
+            f"{100 * prob['prob']:.0f}%의 확률로 {prob['point']}P 획득"
+            for prob in probabilities
+        )
+
+        # 사용자에게 안내 (현재 열쇠 개수는 열 때마다 덧붙입니다)
+        self.open_description = {
+            is_premium: description
+            + f"\n\n열쇠 {self.required_keys[is_premium]}개를 사용해서 **{self.name}**를 열어볼까요?\n"
+            for is_premium in (False, True)
+        }
+
+    def open_view(self, is_premium: bool, key_count: int) -> Embed:
+        description = (
+            self.open_description[is_premium]
+            + f"(현재 열쇠 **{key_count}개**를 가지고 있어요!)"
+        )
+        return Embed(title=self.name, description=description).set_thumbnail(
+            url=self.image
+        )
+
+
+def _require(data: dict, field: str, kind, key: str):
+    if not isinstance(data, dict):
+        raise ValueError(f"box '{key}': expected an object")
+    if not isinstance(data.get(field), kind) or isinstance(data.get(field), bool):
+        raise ValueError(f"box '{key}': '{field}' is missing or has a wrong type")
+    return data[field]
+
+
+class BoxCatalog:
+    """
+    box.json을 읽어 만든 상자 목록입니다.
+    refresh()는 check_interval 초마다 파일의 수정 시각을 확인하고, 바뀌었다면 다시 읽습니다.
+    """
+
+    def __init__(self, path: Path, check_interval: float = 5.0) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        self.mtime = 0.0
+        self.checked_at = 0.0
+
+        self.boxes: Dict[str, Box] = {}
+        self.by_emoji: Dict[str, str] = {}
+        self.menu_emojis: List[str] = []
+        self.menu_embeds: Dict[bool, Embed] = {}
+        self.load()
+
+    def load(self) -> None:
+        mtime = os.stat(self.path).st_mtime
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or not data:
+            raise ValueError("box catalog must be a non-empty object")
+
+        boxes = {key: Box(key, box) for key, box in data.items()}
+        self.boxes = boxes
+        self.by_emoji = {box.emoji: key for key, box in boxes.items()}
+        self.menu_emojis = [*self.by_emoji.keys(), "❌"]
+        # 공유되는 객체이므로 사용하는 쪽에서 수정하면 안 됩니다.
+        self.menu_embeds = {
+            is_premium: Embed(
+                title="어떤 상자를 열어볼까요?",
+                description="\n".join(
+                    box.menu_line[is_premium] for box in boxes.values()
+                ),
+            )
+            for is_premium in (False, True)
+        }
+        self.mtime = mtime
+        self.checked_at = time.monotonic()
+
+    def refresh(self) -> None:
+        now = time.monotonic()
+        if now - self.checked_at < self.check_interval:
+            return
+        self.checked_at = now
+
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError as e:
+            logger.error(f"failed to check {self.path}: {e}")
+            return
+        if mtime == self.mtime:
+            return
+
+        try:
+            self.load()
+            logger.info(f"reloaded {self.path}")
+        except (OSError, ValueError) as e:
+            # 잘못된 파일을 저장한 경우에는 파일이 다시 바뀔 때까지 기존 목록을 사용합니다.
+            self.mtime = mtime
+            logger.error(f"failed to reload {self.path}: {e}")
+
+
+catalogs: Dict[Path, BoxCatalog] = {}
+
+
+def shared(path: Path) -> BoxCatalog:
+    """
+    경로마다 하나의 BoxCatalog를 만들어 공유합니다.
+    확장을 다시 불러올 때 파일을 다시 읽지 않고, 바뀐 내용은 refresh()가 반영합니다.
+    """
+    if path not in catalogs:
+        catalogs[path] = BoxCatalog(path)
+    return catalogs[path]
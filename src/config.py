@@ -0,0 +1,256 @@
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Mapping, Optional, Tuple, overload
+
+from dotenv import load_dotenv
+
+root = Path(__file__).resolve().parent.parent
+resources = root / "src" / "resources"
+
+
+class Environment:
+    """
+    환경 변수를 타입에 맞게 읽습니다. 빈 값은 지정하지 않은 것으로 봅니다.
+    기본값을 지정하면 None을 반환하지 않습니다.
+    """
+
+    def __init__(self, env: Mapping[str, str]) -> None:
+        self.env = env
+
+    @overload
+    def string(self, name: str) -> Optional[str]:
+        ...
+
+    @overload
+    def string(self, name: str, default: str) -> str:
+        ...
+
+    def string(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        value = self.env.get(name, "").strip()
+        return value if value else default
+
+    @overload
+    def integer(self, name: str) -> Optional[int]:
+        ...
+
+    @overload
+    def integer(self, name: str, default: int) -> int:
+        ...
+
+    def integer(self, name: str, default: Optional[int] = None) -> Optional[int]:
+        value = self.string(name)
+        return int(value) if value is not None else default
+
+    def number(self, name: str, default: float) -> float:
+        value = self.string(name)
+        return float(value) if value is not None else default
+
+    def flag(self, name: str, default: bool) -> bool:
+        value = self.string(name)
+        return value == "1" if value is not None else default
+
+    def items(self, name: str) -> Tuple[str, ...]:
+        return tuple(
+            item.strip() for item in self.string(name, "").split(",") if item.strip()
+        )
+
+
+@dataclass(frozen=True)
+class ForteApiConfig:
+    base_url: Optional[str]
+    token: Optional[str]
+
+    # 커넥션 풀
+    pool_limit: int
+    pool_limit_per_host: int
+    dns_cache_ttl: int
+    keepalive_timeout: float
+    connect_timeout: float
+    request_timeout: float
+
+    # 사용자 정보와 열쇠 개수 캐시
+    user_cache_size: int
+    user_cache_ttl: float
+    user_cache_negative_ttl: float
+    key_cache_ttl: float
+
+    # 요청 속도 제한
+    rate_limit: float
+    rate_burst: int
+    max_in_flight: int
+    queue_timeout: float
+
+    # 재시도와 서킷 브레이커
+    retry_attempts: int
+    retry_base_delay: float
+    retry_max_delay: float
+    breaker_threshold: int
+    breaker_reset_timeout: float
+
+    # 응답 디코딩
+    json_backend: str
+    stream_chunk_size: int
+
+
+@dataclass(frozen=True)
+class UserConfig:
+    # 필수 값이지만 User 확장을 불러올 때 확인합니다.
+    guild_whitelist: Tuple[int, ...]
+    premium_role: Optional[int]
+    subscriber_role: Optional[int]
+    box_catalog_path: Path
+
+    attendance_workers: int
+    attendance_rate: float
+    attendance_queue_size: int
+    attendance_ack_threshold: int
+    reply_window: float
+
+
+@dataclass(frozen=True)
+class ForteConfig:
+    # 필수 값이지만 Forte 확장을 불러올 때 확인합니다.
+    admin_role: Optional[int]
+    # 청약철회할 수 없는 아이템 ID
+    refund_disabled: frozenset
+    bulk_deposit_concurrency: int
+
+
+@dataclass(frozen=True)
+class LedgerConfig:
+    # 포인트 기록을 모아서 한 번에 기록하는 개수와 최대 대기 시간(초)
+    batch_size: int
+    flush_interval: float
+
+
+@dataclass(frozen=True)
+class BotConfig:
+    token: Optional[str]
+    metrics_host: str
+    metrics_port: Optional[int]
+    shutdown_deadline: float
+    health_file: str
+    log_config: Path
+    log_file: Optional[str]
+    store_path: str
+
+    # SHARD_COUNT가 없으면 샤딩 없이 실행합니다.
+    shard_count: Optional[str]
+    shard_ids: Optional[str]
+    identify_lock_file: str
+    identify_interval: float
+
+    # READY 이후 마지막 GUILD_CREATE를 받고 준비가 끝났다고 판단하기까지 기다리는 시간(초)
+    guild_ready_timeout: float
+    lean_memory: bool
+    max_messages: int
+    # 자주 쓰이지 않는 확장을 처음 필요할 때 불러올지 여부
+    lazy_extensions: bool
+    # 로컬 테스트용 가짜 게이트웨이를 사용할 때만 설정합니다.
+    discord_api_base: Optional[str]
+
+
+@dataclass(frozen=True)
+class SupervisorConfig:
+    processes: int
+    restart_max_delay: float
+
+
+@dataclass(frozen=True)
+class Config:
+    api: ForteApiConfig
+    user: UserConfig
+    forte: ForteConfig
+    ledger: LedgerConfig
+    bot: BotConfig
+    supervisor: SupervisorConfig
+
+
+def load(env: Optional[Mapping[str, str]] = None) -> Config:
+    """
+    환경 변수로 설정을 만듭니다. env를 지정하지 않으면 .env 파일을 읽은 뒤 os.environ을 사용합니다.
+    프로세스에 직접 지정한 환경 변수가 .env 파일보다 우선합니다.
+    """
+    if env is None:
+        load_dotenv()
+        env = os.environ
+    e = Environment(env)
+
+    lean_memory = e.flag("LEAN_MEMORY", True)
+    return Config(
+        api=ForteApiConfig(
+            base_url=e.string("FORTE_BASE_URL"),
+            token=e.string("FORTE_TOKEN"),
+            pool_limit=e.integer("FORTE_POOL_LIMIT", 100),
+            pool_limit_per_host=e.integer("FORTE_POOL_LIMIT_PER_HOST", 30),
+            dns_cache_ttl=e.integer("FORTE_DNS_CACHE_TTL", 300),
+            keepalive_timeout=e.number("FORTE_KEEPALIVE_TIMEOUT", 30),
+            connect_timeout=e.number("FORTE_CONNECT_TIMEOUT", 5),
+            request_timeout=e.number("FORTE_TIMEOUT", 15),
+            user_cache_size=e.integer("FORTE_USER_CACHE_SIZE", 1000),
+            user_cache_ttl=e.number("FORTE_USER_CACHE_TTL", 60),
+            user_cache_negative_ttl=e.number("FORTE_USER_CACHE_NEGATIVE_TTL", 10),
+            key_cache_ttl=e.number("FORTE_KEY_CACHE_TTL", 300),
+            rate_limit=e.number("FORTE_RATE_LIMIT", 20),
+            rate_burst=e.integer("FORTE_RATE_BURST", 40),
+            max_in_flight=e.integer("FORTE_MAX_IN_FLIGHT", 20),
+            queue_timeout=e.number("FORTE_QUEUE_TIMEOUT", 10),
+            retry_attempts=e.integer("FORTE_RETRY_ATTEMPTS", 3),
+            retry_base_delay=e.number("FORTE_RETRY_BASE_DELAY", 0.2),
+            retry_max_delay=e.number("FORTE_RETRY_MAX_DELAY", 2),
+            breaker_threshold=e.integer("FORTE_BREAKER_THRESHOLD", 5),
+            breaker_reset_timeout=e.number("FORTE_BREAKER_RESET_TIMEOUT", 30),
+            json_backend=e.string("FORTE_JSON_BACKEND", "auto"),
+            stream_chunk_size=e.integer("FORTE_STREAM_CHUNK_SIZE", 65536),
+        ),
+        user=UserConfig(
+            guild_whitelist=tuple(int(i) for i in e.items("GUILD_WHITELIST")),
+            premium_role=e.integer("PREMIUM_ROLE"),
+            subscriber_role=e.integer("SUBSCRIBER_ROLE"),
+            box_catalog_path=Path(
+                e.string("BOX_CATALOG_PATH", str(resources / "box.json"))
+            ),
+            attendance_workers=e.integer("ATTENDANCE_WORKERS", 4),
+            attendance_rate=e.number("ATTENDANCE_RATE", 10),
+            attendance_queue_size=e.integer("ATTENDANCE_QUEUE_SIZE", 1000),
+            attendance_ack_threshold=e.integer("ATTENDANCE_ACK_THRESHOLD", 50),
+            reply_window=e.number("REPLY_BATCH_WINDOW", 1.0),
+        ),
+        forte=ForteConfig(
+            admin_role=e.integer("ADMIN_ROLE"),
+            refund_disabled=frozenset(e.items("DISABLE_WITHDRAW_ITEMS")),
+            bulk_deposit_concurrency=e.integer("BULK_DEPOSIT_CONCURRENCY", 5),
+        ),
+        ledger=LedgerConfig(
+            batch_size=e.integer("LEDGER_BATCH_SIZE", 500),
+            flush_interval=e.number("LEDGER_FLUSH_INTERVAL", 1.0),
+        ),
+        bot=BotConfig(
+            token=e.string("BOT_TOKEN"),
+            metrics_host=e.string("METRICS_HOST", "127.0.0.1"),
+            metrics_port=e.integer("METRICS_PORT"),
+            shutdown_deadline=e.number("SHUTDOWN_DEADLINE", 30),
+            health_file=e.string("LARA_HEALTH_FILE", "lara.health"),
+            log_config=Path(e.string("LARA_LOG_CONFIG", str(root / "logging.json"))),
+            log_file=e.string("LARA_LOG_FILE"),
+            store_path=e.string("LARA_STORE_PATH", "lara.db"),
+            shard_count=e.string("SHARD_COUNT"),
+            shard_ids=e.string("SHARD_IDS"),
+            identify_lock_file=e.string("IDENTIFY_LOCK_FILE", "lara.identify"),
+            identify_interval=e.number("IDENTIFY_INTERVAL", 5),
+            guild_ready_timeout=e.number("GUILD_READY_TIMEOUT", 0.5),
+            lean_memory=lean_memory,
+            max_messages=e.integer("MAX_MESSAGES", 0 if lean_memory else 1000),
+            lazy_extensions=e.flag("LAZY_EXTENSIONS", True),
+            discord_api_base=e.string("DISCORD_API_BASE"),
+        ),
+        supervisor=SupervisorConfig(
+            processes=e.integer("SHARD_PROCESSES", os.cpu_count() or 1),
+            restart_max_delay=e.number("SHARD_RESTART_MAX_DELAY", 60),
+        ),
+    )
+
+
+# 모든 모듈과 확장이 공유하는 설정입니다. 확장을 다시 불러와도 새로 읽지 않습니다.
+config = load()
@@ -0,0 +1,221 @@
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import metrics
+from discord.ext import commands
+
+
+class Policy:
+    """
+    명령어 하나에 적용하는 제한입니다.
+
+    scope("user" 또는 "guild")마다 per 초 동안 최대 rate번까지 실행할 수 있고,
+    concurrency를 지정하면 한 사용자가 동시에 실행할 수 있는 수를 제한합니다.
+    """
+
+    scopes = ("user", "guild")
+
+    def __init__(
+        self,
+        rate: int,
+        per: float,
+        scope: str = "user",
+        concurrency: Optional[int] = None,
+    ) -> None:
+        if scope not in self.scopes:
+            raise ValueError(f"unknown cooldown scope: {scope}")
+        self.rate = rate
+        self.per = per
+        self.scope = scope
+        self.concurrency = concurrency
+
+    def key(self, ctx: commands.Context) -> int:
+        if self.scope == "guild" and ctx.guild is not None:
+            return ctx.guild.id
+        if self.scope == "guild":
+            return ctx.channel.id
+        return ctx.author.id
+
+
+def limit(
+    rate: int, per: float, scope: str = "user", concurrency: Optional[int] = None
+):
+    """
+    명령어에 Policy를 추가하는 데코레이터입니다. 여러 번 사용하면 모든 제한을 통과해야 실행됩니다.
+
+        @commands.command("상자")
+        @cooldown.limit(3, 30, concurrency=1)
+        async def unpack_box(self, ctx): ...
+    """
+    policy = Policy(rate, per, scope, concurrency)
+
+    def decorator(func):
+        target = func.callback if isinstance(func, commands.Command) else func
+        if not hasattr(target, "cooldown_policies"):
+            target.cooldown_policies = []
+        target.cooldown_policies.append(policy)
+        # 명령어를 실행할 때마다 계산하지 않도록 가장 작은 동시 실행 수를 미리 구해 둡니다.
+        target.cooldown_concurrency = min(
+            (p.concurrency for p in target.cooldown_policies if p.concurrency),
+            default=None,
+        )
+        return func
+
+    return decorator
+
+
+class BucketTable:
+    """
+    키마다 per 초 동안의 실행 횟수를 세는 버킷 목록입니다.
+
+    버킷은 만들어진 순서대로 저장되고, 모든 버킷의 유효 시간이 같으므로 저장된 순서가 곧 만료 순서입니다.
+    따라서 만료된 버킷은 앞에서부터 확인하는 것만으로 모두 지울 수 있고, 확인과 정리 모두 O(1)입니다.
+    """
+
+    def __init__(self, rate: int, per: float) -> None:
+        self.rate = rate
+        self.per = per
+        # 키 -> [만료 시각, 실행 횟수]
+        self.buckets: "OrderedDict[int, List]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+    def retry_after(self, key: int, now: float) -> float:
+        """
+        실행 횟수를 늘리지 않고 확인만 합니다. 허용하면 0을, 거절하면 다시 시도할 수 있을 때까지 남은 시간을 반환합니다.
+        """
+        self.sweep(now)
+        bucket = self.buckets.get(key)
+        if bucket is not None and bucket[1] >= self.rate:
+            return bucket[0] - now
+        return 0.0
+
+    def hit(self, key: int, now: float) -> None:
+        """
+        실행 횟수를 하나 늘립니다. retry_after()로 허용되는지 확인한 뒤에 호출해야 합니다.
+        """
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            self.buckets[key] = [now + self.per, 1]
+        else:
+            bucket[1] += 1
+
+    def sweep(self, now: float) -> None:
+        buckets = self.buckets
+        while buckets:
+            key = next(iter(buckets))
+            if buckets[key][0] > now:
+                break
+            buckets.popitem(last=False)
+
+
+class CooldownRejected(commands.CommandError):
+    """
+    쿨다운에 걸려 명령어를 실행하지 않을 때 발생합니다. 답장하지 않고 무시해야 합니다.
+    """
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Cooldowns:
+    """
+    명령어를 실행하기 전에 Policy를 확인합니다.
+    거절할 때는 메시지를 보내지 않으므로 FORTE와 디스코드 API를 전혀 호출하지 않습니다.
+    """
+
+    def __init__(self) -> None:
+        # (명령어 이름, Policy 순서) -> BucketTable
+        self.tables: Dict[Tuple[str, int], BucketTable] = {}
+        # (명령어 이름, 사용자 ID) -> 실행 중인 수
+        self.active: Dict[Tuple[str, int], int] = {}
+
+    def check(self, ctx: commands.Context) -> Optional[str]:
+        """
+        실행을 허용하면 None을, 거절하면 거절 이유("concurrency" 또는 "rate")를 반환합니다.
+        모든 Policy를 통과한 경우에만 실행 횟수를 늘리며, 명령어가 끝난 뒤에는 release()를 호출해야 합니다.
+        """
+        callback = ctx.command.callback
+        policies = getattr(callback, "cooldown_policies", None)
+        if not policies:
+            return None
+
+        name = ctx.command.qualified_name
+        active_key = (name, ctx.author.id)
+        concurrency = callback.cooldown_concurrency
+        if concurrency is not None and self.active.get(active_key, 0) >= concurrency:
+            return self.reject(ctx, "concurrency")
+
+        now = time.monotonic()
+        hits = []
+        for index, policy in enumerate(policies):
+            table = self.tables.get((name, index))
+            # 확장을 다시 불러와 제한이 바뀐 경우에는 새로 만듭니다.
+            if table is None or (table.rate, table.per) != (policy.rate, policy.per):
+                table = self.tables[(name, index)] = BucketTable(
+                    policy.rate, policy.per
+                )
+            key = policy.key(ctx)
+            if table.retry_after(key, now) > 0:
+                return self.reject(ctx, "rate")
+            hits.append((table, key))
+
+        # 다른 Policy에서 거절된 명령어가 앞선 Policy의 횟수를 쓰지 않도록 마지막에 한꺼번에 늘립니다.
+        for table, key in hits:
+            table.hit(key, now)
+        if concurrency is not None:
+            self.active[active_key] = self.active.get(active_key, 0) + 1
+            # Context에 없는 속성이므로 setattr/getattr로 다룹니다.
+            setattr(ctx, "cooldown_active", active_key)
+        cooldown_total.inc(command=name, result="allowed")
+        return None
+
+    def reject(self, ctx: commands.Context, reason: str) -> str:
+        cooldown_total.inc(command=ctx.command.qualified_name, result=reason)
+        return reason
+
+    def release(self, ctx: commands.Context) -> None:
+        """
+        check()가 이 ctx에 늘린 실행 중인 수를 되돌립니다. 허용되지 않은 ctx에는 아무것도 하지 않습니다.
+        """
+        key = getattr(ctx, "cooldown_active", None)
+        if key is None:
+            return
+        setattr(ctx, "cooldown_active", None)
+        count = self.active.get(key)
+        if count is None:
+            return
+        if count <= 1:
+            del self.active[key]
+        else:
+            self.active[key] = count - 1
+
+    def sweep(self) -> int:
+        """
+        만료된 버킷을 모두 지우고 남은 버킷 수를 반환합니다.
+        """
+        now = time.monotonic()
+        for table in self.tables.values():
+            table.sweep(now)
+        return sum(map(len, self.tables.values()))
+
+
+cooldowns = Cooldowns()
+cooldown_total = metrics.registry.register(
+    metrics.Counter(
+        "lara_cooldown_total",
+        "쿨다운 확인 결과 (allowed, rate, concurrency)",
+        ["command", "result"],
+    )
+)
+metrics.registry.register(
+    metrics.Gauge(
+        "lara_cooldown_state",
+        "쿨다운 버킷과 실행 중인 명령어 수",
+        ["state"],
+        lambda: {("buckets",): cooldowns.sweep(), ("active",): len(cooldowns.active)},
+    )
+)
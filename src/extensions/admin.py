@@ -1,10 +1,21 @@
 import os
 from datetime import datetime
 
+import api
+import cooldown
+import memory
+import metrics
 import psutil
 from discord.ext import commands
 
 
+def describe_latency(summary: metrics.Summary, key) -> str:
+    p50, p95, p99 = (1000 * summary.quantile(key, q) for q in metrics.Summary.quantiles)
+    return (
+        f"{summary.counts[key]}회, p50 {p50:.0f}ms / p95 {p95:.0f}ms / p99 {p99:.0f}ms"
+    )
+
+
 class Admin(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -29,6 +40,70 @@ class Admin(commands.Cog):
             f"**Server Uptime** {server_uptime}\n" + f"**Bot Uptime** {python_uptime}"
         )
 
+    @commands.command("metrics", brief="명령어와 FORTE API 호출 지표를 요약합니다.")
+    async def metrics_summary(self, ctx):
+        lines = ["**FORTE API**"]
+        for key in sorted(metrics.forte_request_seconds.recent):
+            method, endpoint = key
+            lines.append(
+                f"`{method.upper()} {endpoint}` "
+                + describe_latency(metrics.forte_request_seconds, key)
+            )
+
+        lines.append("\n**명령어**")
+        for key in sorted(metrics.command_seconds.recent):
+            errors = metrics.commands_total.values.get(key + ("error",), 0)
+            lines.append(
+                f"`{key[0]}` "
+                + describe_latency(metrics.command_seconds, key)
+                + f", 실패 {errors:.0f}회"
+            )
+
+        errors = metrics.attendance_errors_total.values
+        if errors:
+            lines.append("\n**출석/상자 실패**")
+            lines.append(
+                ", ".join(
+                    f"`{key[0]}` {count:.0f}회" for key, count in sorted(errors.items())
+                )
+            )
+
+        rejected = {
+            key: count
+            for key, count in cooldown.cooldown_total.values.items()
+            if key[1] != "allowed"
+        }
+        if rejected:
+            lines.append("\n**쿨다운 거절**")
+            lines.append(
+                ", ".join(
+                    f"`{command}` {reason} {count:.0f}회"
+                    for (command, reason), count in sorted(rejected.items())
+                )
+            )
+
+        stats = api.throttle.stats()
+        lines.append(
+            f"\n**요청 대기열** 대기 {stats['waiting']} / 처리 중 {stats['in_flight']}"
+            + f" / 거절 {stats['rejected']}, 평균 대기 {1000 * stats['avg_wait']:.0f}ms"
+            + f", 최대 대기 {1000 * stats['max_wait']:.0f}ms"
+        )
+
+        await ctx.send("\n".join(lines)[:2000])
+
+    @commands.command(brief="프로세스 메모리 사용량과 캐시 종류별 추정 크기를 확인합니다.")
+    async def memory(self, ctx):
+        process = psutil.Process(os.getpid())
+        lines = [
+            f"**RSS** {process.memory_info().rss / 2 ** 20:.1f}MiB",
+            f"**인텐트** {self.bot.intents.value}, "
+            + f"**메시지 캐시** {self.bot._connection.max_messages or 0}개",
+            "",
+        ]
+        for name, count, size in memory.cache_report(self.bot):
+            lines.append(f"`{name}` {count}개, 약 {size / 2 ** 10:.0f}KiB")
+        await ctx.send("\n".join(lines)[:2000])
+
 
 def setup(bot):
     bot.add_cog(Admin(bot))
@@ -1,40 +1,68 @@
 import asyncio
+import csv
+import io
 import logging
-import os
 import re
+import time
+from typing import Dict, List, Optional, Tuple
 
+import api
 import discord
 import interface
 from api import request
+from config import config
 from discord.ext import commands
-from dotenv import load_dotenv
+from ledger import ledger
+from store import JournalEntry, store
 
-load_dotenv(verbose=True, override=True)
+settings = config.forte
+
+forte_point = "<:fortepoint:788766295406542868>"
+refund_separator = re.compile(r"[\s,]+")
+uncertain_notice = "FORTE에서 확인한 뒤 `라라야 포르테 미완료` 명령어로 정리해주세요."
+
+
+class ForteUserNotFound(commands.CommandError):
+    def __init__(self, reply: str, message: str) -> None:
+        self.reply = reply
+        super().__init__(message)
 
 
 class ForteUser(commands.Converter):
     discord_id_pattern = re.compile(r"^(?:<@!?)?(\d{18})>?$")
 
     async def convert(self, ctx, argument):
+        try:
+            return await self.resolve(argument)
+        except ForteUserNotFound as e:
+            await ctx.send(e.reply)
+            raise
+
+    @classmethod
+    async def resolve(cls, argument: str) -> dict:
+        """
+        디스코드 멘션, 디스코드 ID 또는 FORTE 사용자 ID로 사용자 정보를 조회합니다.
+        사용자를 찾을 수 없으면 ForteUserNotFound가 발생합니다.
+        """
         user = None
-        match = self.discord_id_pattern.match(argument)
+        match = cls.discord_id_pattern.match(argument)
         if match:
             discord_id = match.group(1)
-            user, _ = await request("get", f"/discords/{discord_id}")
-            if "id" not in user.keys():
-                await ctx.send("FORTE에 가입하지 않은 디스코드 계정입니다.")
-                raise commands.CommandError(
-                    f"Unregistered user (Discord ID: {discord_id})"
+            user = await api.get_discord_user(discord_id)
+            if not isinstance(user, dict) or "id" not in user:
+                raise ForteUserNotFound(
+                    "FORTE에 가입하지 않은 디스코드 계정입니다.",
+                    f"Unregistered user (Discord ID: {discord_id})",
                 )
         else:
-            user, _ = await request("get", f"/users/{argument}")
+            user = await api.get_user(argument)
             if type(user) is not dict:
-                await ctx.send("존재하지 않는 사용자 정보입니다.")
-                raise commands.CommandError(f"User not found (User ID: {argument})")
+                raise ForteUserNotFound(
+                    "존재하지 않는 사용자 정보입니다.", f"User not found (User ID: {argument})"
+                )
 
         if user.get("deleted_at") is not None:
-            await ctx.send("탈퇴한 사용자입니다.")
-            raise commands.CommandError(f"Deleted user (User ID: {user['id']})")
+            raise ForteUserNotFound("탈퇴한 사용자입니다.", f"Deleted user (User ID: {user['id']})")
 
         return user
 
@@ -46,19 +74,240 @@ class ForteUser(commands.Converter):
                 description=user.get("email", ""),
             )
             .add_field(name="가입 시각", value=user.get("created_at", ""))
-            .add_field(name="보유 포인트", value=f"{user['points']}<:fortepoint:788766295406542868>")
+            .add_field(name="보유 포인트", value=f"{user['points']}{forte_point}")
         )
 
 
+class DepositRow:
+    """
+    일괄 지급 CSV 파일의 한 줄입니다.
+    """
+
+    def __init__(self, line: int, target: str, amount: str) -> None:
+        self.line = line
+        self.target = target.strip()
+        self.amount = amount.strip()
+        self.points = 0
+        self.user: Optional[dict] = None
+        self.receipt_id = None
+        self.error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.receipt_id is not None or self.error is not None
+
+    def to_csv(self) -> List:
+        user = self.user or {}
+        return [
+            self.line,
+            self.target,
+            user.get("id", ""),
+            user.get("name", ""),
+            self.amount,
+            "success" if self.receipt_id is not None else "failure",
+            "" if self.receipt_id is None else self.receipt_id,
+            self.error or "",
+        ]
+
+
+def parse_deposit_rows(text: str) -> List[DepositRow]:
+    """
+    `대상,포인트` 형식의 CSV를 읽습니다. 대상은 디스코드 멘션, 디스코드 ID 또는 FORTE 사용자 ID입니다.
+    코드 블록과 헤더 줄은 무시합니다.
+    """
+    text = text.strip().strip("`")
+    if text.startswith("csv\n"):
+        text = text[4:]
+
+    rows = []
+    for line, fields in enumerate(csv.reader(io.StringIO(text)), start=1):
+        if not fields or not "".join(fields).strip():
+            continue
+
+        row = DepositRow(line, fields[0], fields[1] if len(fields) > 1 else "")
+        try:
+            row.points = int(row.amount)
+        except ValueError:
+            if line == 1:
+                continue
+            row.error = "포인트가 올바른 정수가 아닙니다."
+        rows.append(row)
+    return rows
+
+
+class RefundJob:
+    """
+    아이템 하나의 청약철회 진행 상태입니다.
+
+    PENDING(대기) -> DELETING(아이템 삭제 요청 중) -> EXPIRED(아이템 삭제 확인)
+    -> CREDITING(포인트 지급 요청 중) -> CREDITED(포인트 지급 완료) 순서로 진행되며,
+    도중에 실패하면 마지막으로 완료한 단계 다음부터 다시 시도합니다.
+
+    요청은 보내기 전에 다음 단계를 기록합니다. 삭제는 다시 요청해도 결과가 같으므로
+    DELETING에서 멈춘 작업은 다시 삭제하고 확인합니다. 포인트 지급은 요청이 확실히 실패한
+    경우(4xx 응답, ForteBusy, ForteCircuitOpen)에만 EXPIRED로 되돌려 다시 시도할 수 있게 하고,
+    FORTE가 포인트를 지급했는지 알 수 없으면 CREDITING으로 남겨 관리자가 확인하도록 표시합니다.
+    """
+
+    PENDING = "pending"
+    DELETING = "deleting"
+    EXPIRED = "expired"
+    CREDITING = "crediting"
+    CREDITED = "credited"
+
+    logger = logging.getLogger("lara.forte")
+
+    def __init__(self, user_id: int, item_id: int, name: str) -> None:
+        self.user_id = user_id
+        self.item_id = item_id
+        self.name = name
+        self.price = 0
+        self.state = self.PENDING
+        self.receipt_id = None
+        self.error: Optional[str] = None
+        self.running = False
+        self.journal_id: Optional[int] = None
+        # 포인트 지급 요청에 걸린 시간(초)
+        self.latency = 0.0
+
+    @classmethod
+    def from_journal(cls, entry: JournalEntry) -> "RefundJob":
+        payload = entry.payload
+        job = cls(payload["user_id"], payload["item_id"], payload["name"])
+        job.price = payload["price"]
+        job.state = entry.state
+        job.journal_id = entry.id
+        return job
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        return self.user_id, self.item_id
+
+    async def record(self, done: bool = False) -> None:
+        """
+        현재 단계를 저널에 기록합니다. 재시작 후에도 이어서 처리할 수 있게 하기 위함입니다.
+        """
+        payload = {
+            "user_id": self.user_id,
+            "item_id": self.item_id,
+            "name": self.name,
+            "price": self.price,
+            "receipt_id": self.receipt_id,
+            "error": self.error,
+        }
+        if self.journal_id is None:
+            self.journal_id = await store.begin(
+                "refund", f"{self.user_id}:{self.item_id}", self.state, payload
+            )
+        else:
+            await store.update(self.journal_id, self.state, payload, done)
+
+    async def run(self) -> bool:
+        """
+        다음 단계부터 처리하고 True를 반환합니다.
+        다른 명령어가 이미 처리 중인 작업이면 아무것도 하지 않고 False를 반환합니다.
+        """
+        if self.running:
+            return False
+
+        self.running = True
+        self.error = None
+        try:
+            if self.journal_id is None:
+                await self.record()
+            if self.state in (self.PENDING, self.DELETING):
+                await self.expire()
+            if self.state == self.EXPIRED:
+                await self.credit()
+        except api.ForteError as e:
+            self.error = str(e)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 한 아이템의 에러가 다른 아이템의 처리와 결과 보고를 막지 않도록 여기서 처리합니다.
+            self.logger.exception(f"refund item {self.item_id} of User ID {self.user_id}")
+            self.error = f"처리 중 에러가 발생했습니다: {e!r}"
+        finally:
+            self.running = False
+        return True
+
+    async def expire(self) -> None:
+        endpoint = f"/users/{self.user_id}/items/{self.item_id}"
+        self.state = self.DELETING
+        await self.record()
+        try:
+            await request("delete", endpoint)
+        except (api.ForteBusy, api.ForteCircuitOpen):
+            # 요청을 보내기도 전에 포기했으므로 아이템은 그대로입니다.
+            self.state = self.PENDING
+            await self.record()
+            raise
+        # 확인 요청이 실패하면 DELETING으로 남아, 다시 시도할 때 삭제 여부를 확인합니다.
+        result, _ = await request("get", endpoint, retry=api.idempotent_retry)
+
+        if not isinstance(result, dict) or result.get("expired") != 1:
+            self.error = "아이템 삭제처리가 완료되지 않았습니다."
+            if isinstance(result, dict) and result.get("expired") == 0:
+                self.state = self.PENDING
+                await self.record()
+            return
+
+        self.name = result["name"]
+        self.price = int(result["price"])
+        self.state = self.EXPIRED
+        await self.record()
+
+    async def credit(self) -> None:
+        self.state = self.CREDITING
+        await self.record()
+
+        started = time.perf_counter()
+        try:
+            result, resp = await request(
+                "post", f"/users/{self.user_id}/points", json={"points": self.price}
+            )
+        except (api.ForteBusy, api.ForteCircuitOpen):
+            # 요청을 보내기도 전에 포기했으므로 다시 시도해도 됩니다.
+            self.state = self.EXPIRED
+            await self.record()
+            raise
+        self.latency = time.perf_counter() - started
+
+        if resp.status // 100 == 4:
+            message = "Unknown Error"
+            if isinstance(result, dict):
+                message = result.get("message", message)
+            self.error = f"포인트 지급에 실패했습니다: {message}"
+            self.state = self.EXPIRED
+            await self.record()
+            return
+        if resp.status // 100 != 2:
+            self.error = f"포인트 지급 결과를 확인할 수 없습니다. ({resp.status})"
+            return
+
+        self.receipt_id = result.get("receipt_id", -1)
+        self.state = self.CREDITED
+        await self.record(done=True)
+
+
 class Forte(commands.Cog):
     logger = logging.getLogger("lara.forte")
 
     def __init__(self, bot):
         self.bot = bot
-        admin_role_env = os.getenv("ADMIN_ROLE")
-        if admin_role_env is None:
+        if settings.admin_role is None:
             raise ValueError("Environment variable ADMIN_ROLE is not defined")
-        self.admin_role = int(admin_role_env)
+        self.admin_role = settings.admin_role
+
+        self.refund_disabled = settings.refund_disabled
+        # 포인트 지급까지 끝나지 않은 청약철회 ((사용자 ID, 아이템 ID) -> RefundJob)
+        self.pending_refunds: Dict[Tuple[int, int], RefundJob] = {}
+
+        self.bulk_deposit_concurrency = settings.bulk_deposit_concurrency
+
+        # 봇이 시작된 뒤에 불러온 경우에는 store_ready 이벤트를 받지 못하므로 바로 확인합니다.
+        if store.is_open:
+            asyncio.ensure_future(self.on_store_ready())
 
     async def cog_check(self, ctx):
         if ctx.guild is None:
@@ -74,70 +323,326 @@ class Forte(commands.Cog):
         if isinstance(ctx, commands.CheckFailure):
             return
 
+        original = getattr(error, "original", None)
+        if isinstance(original, api.ForteError):
+            await ctx.send(str(original))
+
         self.logger.error(str(error))
 
     @commands.group(aliases=["포르테", "ㅍ"], brief="포르테 API 관련 명령어가 모아져 있습니다.")
     async def forte(self, ctx):
         pass
 
-    @forte.command(aliases=['청약철회'],brief="포르테 아이템 구매를 청약철회 합니다.")
+    @forte.command(aliases=["청약철회"], brief="포르테 아이템 구매를 청약철회 합니다.")
     async def refund(self, ctx, user: ForteUser):
-        embed=ForteUser.to_embed(user)
-        refund_disabled_env = os.getenv("DISABLE_WITHDRAW_ITEMS").split(",")
+        embed = ForteUser.to_embed(user)
 
+        # 오래된 사용자는 구매 기록이 매우 많으므로, 받는 대로 디코딩하면서 청약철회 가능한 아이템만 남깁니다.
         result, resp = await request(
-            "get", f"/users/{user['id']}/items"
+            "get",
+            f"/users/{user['id']}/items",
+            retry=api.idempotent_retry,
+            decode=api.stream_list(self.is_refundable),
         )
 
         if resp.status // 100 == 4:
             message = result.get("message", "Unknown Error")
             return await ctx.send(f"사용자 아이템 리스트 조회 실패: {message}")
 
-        refundable_items=[]
-        refundable_item_ids=[]
-        for item in result:
-            if str(item['item_id']) not in refund_disabled_env and item['expired'] == 0 and item['consumed'] == 0 and item['sync'] == 0 and item['item']['price'] != 0:
-                refundable_items.append(item)
-                refundable_item_ids.append(str(item['id']))
-        embed.add_field(name="청약철회 가능 아이템", value="-------------------------", inline=False)
-        for item in refundable_items:
-            embed.add_field(name=f"ID: {item['id']}",value=f"{item['item']['name']}\n{item['item']['price']}<:fortepoint:788766295406542868>\n{item['created_at']}")
-
+        refundable_items = {str(item["id"]): item for item in result}
         if len(refundable_items) == 0:
             return await ctx.send("청약철회 가능한 아이템이 없습니다.")
-        await ctx.send("청약철회할 아이템 아이디를 입력해주세요.",embed=embed)
+
+        embed.add_field(
+            name="청약철회 가능 아이템", value="-------------------------", inline=False
+        )
+        # 임베드 필드는 최대 25개까지 추가할 수 있습니다.
+        for item in list(refundable_items.values())[:20]:
+            embed.add_field(
+                name=f"ID: {item['id']}",
+                value=f"{item['item']['name']}\n{item['item']['price']}{forte_point}\n{item['created_at']}",
+            )
+        await ctx.send(
+            "청약철회할 아이템 아이디를 입력해주세요. (여러 개는 띄어쓰기나 쉼표로 구분)",
+            embed=embed,
+        )
 
         def check(m):
-            return m.author == ctx.author and m.channel == ctx.channel and m.content in refundable_item_ids
+            item_ids = refund_separator.split(m.content.strip())
+            return all(item_id in refundable_items for item_id in item_ids)
+
         try:
-            msg = await self.bot.wait_for('message',timeout=30.0, check=check)
+            msg = await interface.wait_for_message(ctx, check, timeout=30.0)
         except asyncio.TimeoutError:
             return await ctx.send("시간초과로 청약철회를 취소합니다.")
-        message = await ctx.send("처리중... 잠시만 기다려 주세요.")
-        await request(
-            "delete", f"/users/{user['id']}/items/{msg.content}"
-        )
-        result, resp = await request(
-            "get", f"/users/{user['id']}/items/{msg.content}"
-        )
 
-        if result['expired'] != 1:
-            return await message.edit(content="아이템 삭제처리가 완료되지 않았습니다. 청약철회 처리를 취소합니다.")
+        # 확인과 등록 사이에 await가 없어야 같은 아이템을 동시에 두 번 청약철회하지 않습니다.
+        jobs, busy = [], []
+        for item_id in dict.fromkeys(refund_separator.split(msg.content.strip())):
+            item = refundable_items[item_id]
+            job = RefundJob(user["id"], item["id"], item["item"]["name"])
+            if job.key in self.pending_refunds:
+                busy.append(f"ID: `{job.item_id}`")
+                continue
+            self.pending_refunds[job.key] = job
+            jobs.append(job)
+
+        if busy:
+            await ctx.send(
+                f"{', '.join(busy)} 아이템은 이미 청약철회가 진행 중입니다.\n"
+                + "`라라야 포르테 청약철회재시도` 명령어로 이어서 처리할 수 있습니다."
+            )
+        if jobs:
+            await self.run_refunds(ctx, user, jobs)
+
+    @forte.command(aliases=["청약철회재시도"], brief="완료되지 않은 청약철회를 이어서 처리합니다.")
+    async def refund_retry(self, ctx, user: ForteUser):
+        jobs = [job for job in self.pending_refunds.values() if job.user_id == user["id"]]
+        if len(jobs) == 0:
+            return await ctx.send("처리가 완료되지 않은 청약철회가 없습니다.")
+
+        await self.run_refunds(ctx, user, jobs)
 
-        pointresult, resp = await request(
-            "post", f"/users/{user['id']}/points", json={"points": result['price']}
+    def is_refundable(self, item: dict) -> bool:
+        return (
+            str(item["item_id"]) not in self.refund_disabled
+            and item["expired"] == 0
+            and item["consumed"] == 0
+            and item["sync"] == 0
+            and item["item"]["price"] != 0
         )
-        if resp.status // 100 == 4:
-            message = result.get("message", "Unknown Error")
-            return await message.edit(content=f"아이템 삭제는 완료되었으나, 포인트 지급에 실패했습니다: {message}\n")
 
-        receipt_id = pointresult.get("receipt_id", -1)
+    async def run_refunds(self, ctx, user: dict, jobs: List["RefundJob"]):
+        message = await ctx.send("처리중... 잠시만 기다려 주세요.")
+        # 아이템끼리는 서로 독립적이므로 동시에 처리합니다.
+        ran = await asyncio.gather(*(job.run() for job in jobs))
+        # 다른 명령어가 처리 중인 작업의 결과는 그 명령어가 정리하고 보고합니다.
+        busy = [job for job, done in zip(jobs, ran) if not done]
+        jobs = [job for job, done in zip(jobs, ran) if done]
+
+        refunded = 0
+        lines = [f"ID: `{job.item_id}` 이미 처리 중인 청약철회입니다." for job in busy]
+        for job in jobs:
+            if job.state == RefundJob.CREDITED:
+                self.pending_refunds.pop(job.key, None)
+                refunded += job.price
+                ledger.record(
+                    "refund",
+                    ctx.author.id,
+                    job.price,
+                    job.latency,
+                    user_id=job.user_id,
+                    receipt_id=job.receipt_id,
+                )
+                self.logger.info(
+                    f"refund item {job.item_id} ({job.price} points) of User ID {job.user_id} by {ctx.author.id} - Receipt {job.receipt_id}",
+                    extra={"user_id": job.user_id, "command": "refund", "status": job.state},
+                )
+                lines.append(
+                    f"ID: `{job.item_id}` 아이템명: `{job.name}` "
+                    + f"환불금액: `{job.price}`{forte_point} 영수증 ID: `{job.receipt_id}`"
+                )
+            else:
+                if job.state == RefundJob.PENDING:
+                    self.pending_refunds.pop(job.key, None)
+                    await job.record(done=True)
+                elif job.state == RefundJob.CREDITING:
+                    # 포인트가 지급되었는지 알 수 없으므로 자동으로 다시 시도하지 않습니다.
+                    self.pending_refunds.pop(job.key, None)
+                    if job.journal_id is not None:
+                        await store.flag(job.journal_id)
+                self.logger.warning(
+                    f"refund item {job.item_id} of User ID {job.user_id} by {ctx.author.id} failed at {job.state}: {job.error}",
+                    extra={"user_id": job.user_id, "command": "refund", "status": job.state},
+                )
+                lines.append(f"ID: `{job.item_id}` 실패: {job.error}")
+
         embed = ForteUser.to_embed(user)
-        pointresult, resp = await request("get", f"/users/{user['id']}")
-        embed.add_field(name="청약철회 이후 포인트",value=f"{int(pointresult['points'])+int(result['price'])}<:fortepoint:788766295406542868>")
-        embed.add_field(name="청약철회 정보",value=f"ID: `{msg.content}`\n아이템명: `{result['name']}`\n환불금액: `{result['price']}`<:fortepoint:788766295406542868>\n영수증 ID: `{receipt_id}`",inline=False)
+        after = None
+        if refunded > 0:
+            # 포인트는 이미 지급되었으므로, 조회에 실패해도 영수증 ID는 보고합니다.
+            try:
+                after = await api.get_user(user["id"])
+            except api.ForteError as e:
+                self.logger.warning(f"failed to get User ID {user['id']} after refund: {e!r}")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.logger.exception(f"failed to get User ID {user['id']} after refund")
+        if isinstance(after, dict) and "points" in after:
+            embed.add_field(
+                name="청약철회 이후 포인트",
+                value=f"{int(after['points']) + refunded}{forte_point}",
+            )
+        embed.add_field(name="청약철회 정보", value="\n".join(lines)[:1024], inline=False)
 
-        await message.edit(content=f"청약철회 완료!",embed=embed)
+        notices = []
+        if any(job.state == RefundJob.DELETING for job in jobs):
+            notices.append(
+                "아이템이 삭제되었는지 확인하지 못한 항목이 있습니다.\n"
+                + "`라라야 포르테 청약철회재시도` 명령어로 삭제 여부를 다시 확인할 수 있습니다."
+            )
+        if any(job.state == RefundJob.EXPIRED for job in jobs):
+            notices.append(
+                "아이템 삭제는 완료되었으나 포인트 지급에 실패한 항목이 있습니다.\n"
+                + "`라라야 포르테 청약철회재시도` 명령어로 포인트 지급을 다시 시도할 수 있습니다."
+            )
+        if any(job.state == RefundJob.CREDITING for job in jobs):
+            notices.append(
+                "포인트가 지급되었는지 확인할 수 없는 항목이 있습니다.\n" + uncertain_notice
+            )
+        content = "\n".join(notices)
+        if not content:
+            content = "청약철회 완료!" if refunded > 0 else "청약철회 처리를 완료하지 못했습니다."
+        await message.edit(content=content, embed=embed)
+
+    async def post_points(self, ctx, command: str, user_id: int, points: int):
+        """
+        포인트 지급 요청을 저널에 기록한 뒤 보냅니다.
+        FORTE가 요청을 처리했는지 알 수 없으면(5xx 응답, 연결 에러 등) 저널 항목을 완료하지 않고
+        `미완료` 명령어에서 확인할 수 있도록 표시합니다. 4xx 응답만 실패로 기록합니다.
+        """
+        payload = {
+            "user_id": user_id,
+            "points": points,
+            "command": command,
+            "by": ctx.author.id,
+        }
+        entry_id = await store.begin("deposit", str(user_id), "pending", payload)
+        started = time.perf_counter()
+        try:
+            result, resp = await request(
+                "post", f"/users/{user_id}/points", json={"points": points}
+            )
+        except (api.ForteBusy, api.ForteCircuitOpen):
+            # 요청을 보내기도 전에 포기한 경우입니다.
+            await store.update(entry_id, "failed", done=True)
+            raise
+        except Exception:
+            # 요청이 FORTE에 도착했는지 알 수 없습니다.
+            await store.flag(entry_id)
+            raise
+
+        if not isinstance(result, dict):
+            # 프록시 에러 페이지처럼 예상하지 못한 응답도 호출자가 같은 방식으로 처리할 수 있게 합니다.
+            result = {}
+        if resp.status // 100 == 2:
+            payload["receipt_id"] = result.get("receipt_id", -1)
+            ledger.record(
+                command,
+                ctx.author.id,
+                points,
+                time.perf_counter() - started,
+                user_id=user_id,
+                receipt_id=payload["receipt_id"],
+            )
+            await store.update(entry_id, "credited", payload, done=True)
+        elif resp.status // 100 == 4:
+            payload["error"] = result.get("message", "Unknown Error")
+            await store.update(entry_id, "failed", payload, done=True)
+        else:
+            payload["error"] = f"HTTP {resp.status}: {result.get('message', 'Unknown Error')}"
+            await store.update(entry_id, "pending", payload)
+            await store.flag(entry_id)
+        return result, resp
+
+    @commands.Cog.listener()
+    async def on_store_ready(self):
+        """
+        이전 실행에서 끝나지 않은 작업을 확인합니다.
+        아무 요청도 보내지 않은 청약철회는 정리하고, 포인트 지급 요청을 보내기 전에 멈춘 청약철회
+        (DELETING, EXPIRED)는 `청약철회재시도`로 이어서 처리할 수 있도록 불러옵니다.
+        포인트 지급 요청을 보낸 뒤 멈춘 작업은 FORTE에 반영되었는지 알 수 없으므로
+        자동으로 다시 시도하지 않고 관리자가 확인하도록 표시합니다.
+        샤드 프로세스가 여럿이면 다른 프로세스가 진행 중인 작업은 건드리지 않습니다.
+        """
+        resumable = (RefundJob.DELETING, RefundJob.EXPIRED)
+        for entry in await store.incomplete(owner=store.owner):
+            if entry.kind == "refund" and entry.state == RefundJob.PENDING:
+                await store.update(entry.id, "abandoned", done=True)
+            elif entry.kind == "refund" and entry.state in resumable and not entry.flagged:
+                job = RefundJob.from_journal(entry)
+                self.pending_refunds.setdefault(job.key, job)
+                self.logger.info(
+                    f"restored refund of item {job.item_id} of User ID {job.user_id} ({job.state})"
+                )
+            elif not entry.flagged:
+                await store.flag(entry.id)
+                self.logger.warning(
+                    f"incomplete {entry.kind} #{entry.id} ({entry.state}): {entry.payload}",
+                    extra={"command": entry.kind, "status": entry.state},
+                )
+
+    @forte.command(aliases=["미완료"], brief="처리 결과를 알 수 없는 작업을 확인하거나 정리합니다.")
+    async def journal(self, ctx, entry_id: Optional[int] = None):
+        entries = [entry for entry in await store.incomplete() if entry.flagged]
+        if entry_id is None:
+            if len(entries) == 0:
+                return await ctx.send("확인이 필요한 작업이 없습니다.")
+            lines = [
+                f"`#{entry.id}` {entry.kind} ({entry.state}) {entry.payload}"
+                for entry in entries[:20]
+            ]
+            return await ctx.send(
+                "FORTE에 반영되었는지 확인이 필요한 작업입니다. "
+                + "확인을 마친 작업은 `라라야 포르테 미완료 <번호>`로 정리할 수 있습니다.\n"
+                + "\n".join(lines)
+            )
+
+        if entry_id not in {entry.id for entry in entries}:
+            return await ctx.send(f"#{entry_id} 작업을 찾을 수 없습니다.")
+        await store.update(entry_id, "resolved", done=True)
+        self.logger.info(f"journal #{entry_id} resolved by {ctx.author.id}")
+        await ctx.send(f"#{entry_id} 작업을 정리했습니다.")
+
+    @forte.command(aliases=["장부"], brief="최근 며칠 동안 종류별로 오간 포인트 합계를 확인합니다.")
+    async def ledger_summary(self, ctx, days: int = 1):
+        since = time.time() - (max(days, 1) - 1) * 86400
+        await ledger.flush()
+        totals = await store.ledger_totals(since)
+        if len(totals) == 0:
+            return await ctx.send("해당 기간에 기록된 포인트 내역이 없습니다.")
+
+        lines = [f"**{time.strftime('%Y-%m-%d', time.localtime(since))}부터의 포인트 내역**"]
+        for kind, count, amount in totals:
+            lines.append(f"`{kind}` {count}건, {amount}{forte_point}")
+        lines.append(
+            f"합계 {sum(t[1] for t in totals)}건, {sum(t[2] for t in totals)}{forte_point}"
+        )
+        await ctx.send("\n".join(lines))
+
+    @forte.command(aliases=["장부조회"], brief="이용자가 받은 포인트 내역을 확인합니다.")
+    async def ledger_user(self, ctx, target: str, limit: int = 10):
+        user_id, discord_id = None, None
+        match = ForteUser.discord_id_pattern.match(target)
+        if match:
+            discord_id = int(match.group(1))
+            try:
+                user_id = (await ForteUser.resolve(match.group(1)))["id"]
+            except (ForteUserNotFound, api.ForteError):
+                pass
+        elif target.isdigit():
+            user_id = int(target)
+        else:
+            return await ctx.send("디스코드 멘션, 디스코드 ID 또는 FORTE 사용자 ID를 입력해주세요.")
+
+        await ledger.flush()
+        totals = await store.ledger_user_totals(user_id, discord_id)
+        if len(totals) == 0:
+            return await ctx.send("기록된 포인트 내역이 없습니다.")
+
+        lines = [f"**{target}의 포인트 내역**"]
+        lines += [f"`{kind}` {count}건, {amount}{forte_point}" for kind, count, amount in totals]
+        lines.append("\n**최근 내역**")
+        for entry in await store.ledger_user_entries(user_id, discord_id, min(limit, 50)):
+            created_at = time.strftime("%m-%d %H:%M", time.localtime(entry.created_at))
+            line = f"{created_at} `{entry.kind}` {entry.amount}{forte_point}"
+            if entry.actor_id != entry.discord_id:
+                line += f" 지급자 ID: `{entry.actor_id}`"
+            if entry.receipt_id is not None:
+                line += f" 영수증 ID: `{entry.receipt_id}`"
+            lines.append(line)
+        await ctx.send("\n".join(lines)[:2000])
 
     @forte.command(aliases=["사용자"], brief="포르테 이용자 정보를 확인합니다.")
     async def user(self, ctx, user: ForteUser):
@@ -153,19 +658,172 @@ class Forte(commands.Cog):
         if not await interface.is_confirmed(ctx, message):
             return await ctx.send(f"{ctx.author.mention} 취소되었습니다.")
 
-        result, resp = await request(
-            "post", f"/users/{user['id']}/points", json={"points": point}
-        )
+        try:
+            result, resp = await self.post_points(ctx, "deposit", user["id"], point)
+        except (api.ForteBusy, api.ForteCircuitOpen):
+            raise
+        except api.ForteError as e:
+            return await ctx.send(
+                f"{e}\n포인트가 지급되었는지 확인할 수 없습니다. {uncertain_notice}"
+            )
         if resp.status // 100 == 4:
             message = result.get("message", "Unknown Error")
             return await ctx.send(f"포인트 지급에 실패했습니다: {message}")
+        if resp.status // 100 != 2:
+            return await ctx.send(
+                f"포인트 지급 결과를 확인할 수 없습니다. ({resp.status})\n{uncertain_notice}"
+            )
 
         receipt_id = result.get("receipt_id", -1)
         self.logger.info(
-            f"deposit {point} points to User ID {user['id']} by {ctx.author.id} - Receipt {receipt_id}"
+            f"deposit {point} points to User ID {user['id']} by {ctx.author.id} - Receipt {receipt_id}",
+            extra={"user_id": user["id"], "command": "deposit", "status": resp.status},
         )
         await ctx.send(f"포인트 지급에 성공했습니다! (영수증 ID: {receipt_id})")
 
+    @forte.command(aliases=["일괄지급"], brief="CSV로 여러 이용자에게 포인트를 지급합니다.")
+    async def bulk_deposit(self, ctx, *, text: str = ""):
+        if ctx.message.attachments:
+            text = (await ctx.message.attachments[0].read()).decode("utf-8-sig")
+
+        rows = parse_deposit_rows(text)
+        if len(rows) == 0:
+            return await ctx.send(
+                "`대상,포인트` 형식의 CSV 파일을 첨부하거나 명령어 뒤에 붙여넣어 주세요."
+            )
+
+        semaphore = asyncio.Semaphore(self.bulk_deposit_concurrency)
+
+        async def resolve(row: DepositRow):
+            async with semaphore:
+                try:
+                    row.user = await ForteUser.resolve(row.target)
+                except ForteUserNotFound as e:
+                    row.error = e.reply
+                except api.ForteError as e:
+                    row.error = str(e)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # 한 줄의 에러가 나머지 줄의 처리와 결과 보고를 막지 않도록 여기서 처리합니다.
+                    self.logger.exception(f"bulk_deposit line {row.line} failed to resolve")
+                    row.error = f"사용자 조회 중 에러가 발생했습니다: {e!r}"
+
+        await asyncio.gather(*(resolve(row) for row in rows if not row.done))
+        valid_rows = [row for row in rows if not row.done]
+        invalid_rows = [row for row in rows if row.done]
+
+        description = "\n".join(
+            f"{row.line}번째 줄 `{row.target}`: {row.error}" for row in invalid_rows[:10]
+        )
+        if len(invalid_rows) > 10:
+            description += f"\n... 외 {len(invalid_rows) - 10}건"
+        embed = (
+            discord.Embed(title="포인트 일괄 지급", description=description)
+            .add_field(name="지급 대상", value=f"{len(valid_rows)}명")
+            .add_field(
+                name="지급 포인트 합계",
+                value=f"{sum(row.points for row in valid_rows)}{forte_point}",
+            )
+            .add_field(name="제외된 줄", value=f"{len(invalid_rows)}건")
+        )
+        message = await ctx.send(content="다음과 같이 포인트를 지급합니다.", embed=embed)
+
+        if len(valid_rows) == 0 or not await interface.is_confirmed(ctx, message):
+            return await ctx.send(f"{ctx.author.mention} 취소되었습니다.")
+
+        progress = await ctx.send(f"지급 중... (0/{len(valid_rows)})")
+        started = time.monotonic()
+        # 포인트가 지급되었는지 알 수 없어 미완료 작업으로 남은 줄
+        uncertain = []
+
+        async def deposit(row: DepositRow, user: dict):
+            async with semaphore:
+                try:
+                    result, resp = await self.post_points(
+                        ctx, "bulk_deposit", user["id"], row.points
+                    )
+                except (api.ForteBusy, api.ForteCircuitOpen) as e:
+                    row.error = str(e)
+                    return
+                except api.ForteError as e:
+                    row.error = f"{e} (포인트 지급 결과를 확인할 수 없습니다.)"
+                    uncertain.append(row)
+                    return
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.logger.exception(f"bulk_deposit line {row.line} failed")
+                    row.error = f"포인트 지급 중 에러가 발생했습니다: {e!r}"
+                    uncertain.append(row)
+                    return
+
+                if resp.status // 100 == 4:
+                    row.error = result.get("message", "Unknown Error")
+                    return
+                if resp.status // 100 != 2:
+                    row.error = f"포인트 지급 결과를 확인할 수 없습니다. ({resp.status})"
+                    uncertain.append(row)
+                    return
+
+                row.receipt_id = result.get("receipt_id", -1)
+                self.logger.info(
+                    f"deposit {row.points} points to User ID {user['id']} by {ctx.author.id} - Receipt {row.receipt_id}",
+                    extra={
+                        "user_id": user["id"],
+                        "command": "bulk_deposit",
+                        "status": resp.status,
+                    },
+                )
+
+        async def report_progress():
+            while True:
+                await asyncio.sleep(2)
+                done = sum(row.done for row in valid_rows)
+                failed = sum(row.error is not None for row in valid_rows)
+                await progress.edit(
+                    content=f"지급 중... ({done}/{len(valid_rows)}, 실패 {failed}건)"
+                )
+
+        reporter = asyncio.ensure_future(report_progress())
+        try:
+            # 제외되지 않은 줄은 모두 사용자 정보가 있습니다.
+            await asyncio.gather(
+                *(deposit(row, row.user) for row in valid_rows if row.user is not None)
+            )
+        finally:
+            reporter.cancel()
+
+        succeeded = [row for row in valid_rows if row.receipt_id is not None]
+        failed = [row for row in valid_rows if row.error is not None]
+        await progress.edit(
+            content=f"지급 완료! ({len(succeeded)}/{len(valid_rows)}, 실패 {len(failed)}건, "
+            + f"{time.monotonic() - started:.1f}초)"
+        )
+
+        report = io.StringIO()
+        writer = csv.writer(report)
+        writer.writerow(
+            ["line", "target", "user_id", "name", "points", "status", "receipt_id", "error"]
+        )
+        writer.writerows(row.to_csv() for row in rows)
+        content = (
+            f"{ctx.author.mention} 포인트 지급 결과입니다. "
+            + f"(성공 {len(succeeded)}건, 실패 {len(failed) + len(invalid_rows)}건)"
+        )
+        if uncertain:
+            content += (
+                f"\n실패한 줄 중 {len(uncertain)}건은 포인트가 지급되었는지 확인할 수 없습니다. "
+                + uncertain_notice
+            )
+        await ctx.send(
+            content,
+            file=discord.File(
+                io.BytesIO(report.getvalue().encode("utf-8-sig")),
+                filename="deposit_receipts.csv",
+            ),
+        )
+
     @forte.command(aliases=["토큰"], brief="토큰 리프레시")
     async def refresh(self, ctx, clientId: str):
         message = await ctx.send(content=f"{clientId}의 토큰을 리프레시 합니다.")
@@ -1,82 +1,231 @@
-import json
+import asyncio
 import logging
-import os
+import time
+from typing import Dict, List, Optional
 
-from discord import Embed
+import discord
 from discord.ext import commands
-from dotenv import load_dotenv
 
 import api
+import cooldown
 import interface
-from api import request
-
-load_dotenv(verbose=True, override=True)
-
-with open("src/resources/box.json", encoding="utf-8") as f:
-    box_types = json.load(f)
-
-
-def describe_box(box: dict, is_premium: bool) -> str:
-    key = box.get("key_premium", box["key"]) if is_premium else box["key"]
-    max_point = max(p["point"] for p in box["probabilities"])
-    return "{emoji} **{name}** (열쇠 {key}개 필요, 최대 {max_point}P)".format(
-        **dict(box, key=key, max_point=max_point)
-    )
+import metrics
+from catalog import shared
+from config import config
+from ledger import ledger
+from throttle import Throttle
+
+settings = config.user
+catalog = shared(settings.box_catalog_path)
+
+
+class ReplyBatcher:
+    """
+    같은 채널로 보낼 답장을 window 초 동안 모았다가 최대한 적은 수의 메시지로 보냅니다.
+    디스코드의 채널별 메시지 전송 제한에 걸리지 않게 하기 위함입니다.
+    """
+
+    max_length = 2000
+    logger = logging.getLogger("lara.user.reply")
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self.pending: Dict[int, List[str]] = {}
+        self.tasks: Dict[int, asyncio.Future] = {}
+        # close()가 호출되면 기다리고 있던 답장과 이후의 답장을 바로 보냅니다.
+        self.closing = asyncio.Event()
+
+    def send(self, channel: discord.TextChannel, text: str) -> None:
+        batch = self.pending.setdefault(channel.id, [])
+        batch.append(text)
+        if channel.id not in self.tasks:
+            self.tasks[channel.id] = asyncio.ensure_future(self.flush_later(channel))
+
+    async def flush_later(self, channel: discord.TextChannel) -> None:
+        try:
+            await asyncio.wait_for(self.closing.wait(), self.window)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            del self.tasks[channel.id]
+            texts = self.pending.pop(channel.id, [])
+
+        chunk = ""
+        for text in texts:
+            if chunk and len(chunk) + len(text) + 2 > self.max_length:
+                await self.deliver(channel, chunk)
+                chunk = ""
+            chunk = f"{chunk}\n\n{text}" if chunk else text
+        if chunk:
+            await self.deliver(channel, chunk)
+
+    async def deliver(self, channel: discord.TextChannel, content: str) -> None:
+        try:
+            await channel.send(content[: self.max_length])
+        except discord.HTTPException as e:
+            self.logger.error(f"failed to send replies to {channel.id}: {e}")
 
+    async def close(self) -> None:
+        """
+        모아 둔 답장을 기다리지 않고 바로 보내고, 모두 보낼 때까지 기다립니다.
+        """
+        self.closing.set()
+        await asyncio.gather(*list(self.tasks.values()), return_exceptions=True)
+
+
+class AttendanceQueue:
+    """
+    출석 요청을 대기열에 넣고, 작업자들이 정해진 속도로 처리합니다.
+    같은 사용자의 요청이 처리되기 전에 다시 들어오면 하나로 합칩니다.
+    """
+
+    logger = logging.getLogger("lara.user.attendance")
+
+    def __init__(self, handler, replies: ReplyBatcher) -> None:
+        self.handler = handler
+        self.replies = replies
+        workers = settings.attendance_workers
+        self.throttle = Throttle(settings.attendance_rate, workers, workers, None)
+        # 이벤트 루프가 시작된 뒤, 첫 요청을 받을 때 생성합니다. (start())
+        self.queue: "Optional[asyncio.Queue[int]]" = None
+        # 사용자 ID -> 가장 최근에 받은 명령어 컨텍스트
+        self.pending: Dict[int, commands.Context] = {}
+        self.workers: List[asyncio.Future] = []
+        self.merged = 0
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def put(self, ctx: commands.Context) -> None:
+        if ctx.author.id in self.pending:
+            self.pending[ctx.author.id] = ctx
+            self.merged += 1
+            return
 
-def box_open_view(box: dict, is_premium: bool, key_count: int) -> Embed:
-    embed = Embed(title=box["name"]).set_thumbnail(url=box["image"])
+        if len(self.pending) >= settings.attendance_queue_size:
+            self.replies.send(
+                ctx.channel,
+                f"{ctx.author.mention}, ⏳ 출석 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+            )
+            return
 
-    # 필요 열쇠량
-    description = f"열쇠 {box['key']}개 필요"
-    if "key_premium" in box.keys():
-        description += f" (프리미엄: {box['key_premium']}개 필요)"
+        queue = self.queue
+        if queue is None or not self.workers:
+            queue = self.start()
+        self.pending[ctx.author.id] = ctx
+        queue.put_nowait(ctx.author.id)
+
+        if len(self.pending) > settings.attendance_ack_threshold:
+            self.replies.send(
+                ctx.channel,
+                f"{ctx.author.mention}, 출석 요청이 접수되었습니다. 잠시만 기다려주세요. "
+                + f"(대기 {len(self.pending)}명)",
+            )
 
-    # 확률 분포
-    description += "\n\n이 상자를 열면..\n"
-    description += "\n".join(
-        [
-            f"{100 * prob['prob']:.0f}%의 확률로 {prob['point']}P 획득"
-            for prob in box["probabilities"]
+    def start(self) -> "asyncio.Queue[int]":
+        queue: "asyncio.Queue[int]" = asyncio.Queue()
+        self.queue = queue
+        self.workers = [
+            asyncio.ensure_future(self.work(queue))
+            for _ in range(settings.attendance_workers)
         ]
-    )
+        return queue
+
+    async def work(self, queue: "asyncio.Queue[int]") -> None:
+        while True:
+            user_id = await queue.get()
+            try:
+                async with self.throttle.slot():
+                    ctx = self.pending.pop(user_id)
+                    await self.handle(ctx)
+            finally:
+                queue.task_done()
 
-    # 사용자에게 안내
-    key = box.get("key_premium", box["key"]) if is_premium else box["key"]
-    description += f"\n\n열쇠 {key}개를 사용해서 **{box['name']}**를 열어볼까요?\n"
-    description += f"(현재 열쇠 **{key_count}개**를 가지고 있어요!)"
+    async def handle(self, ctx: commands.Context) -> None:
+        try:
+            reply = await self.handler(ctx)
+        except api.ForteError as e:
+            self.logger.warning(f"{ctx.author.id} attend failure, {e!r}")
+            reply = f"{ctx.author.mention}, {e}"
+        except Exception:
+            self.logger.exception(f"{ctx.author.id} attend failure")
+            reply = f"{ctx.author.mention}, 🔥 에러가 발생했습니다. 잠시 후 다시 시도해주세요."
+        self.replies.send(ctx.channel, reply)
+
+    async def join(self) -> None:
+        """
+        대기열에 남은 요청을 모두 처리할 때까지 기다립니다.
+        """
+        if self.queue is not None:
+            await self.queue.join()
 
-    embed.description = description
-    return embed
+    def stop(self) -> None:
+        for worker in self.workers:
+            worker.cancel()
+        self.workers = []
 
 
 class User(commands.Cog):
-    guild_whitelist = [
-        int(guild_id.strip()) for guild_id in os.getenv("GUILD_WHITELIST").split(",")
-    ]
+    guild_whitelist = settings.guild_whitelist
     logger = logging.getLogger("lara.user")
 
     def __init__(self, bot):
         self.bot = bot
 
-        premium_role_env = os.getenv("PREMIUM_ROLE")
-        if premium_role_env is None:
+        if settings.premium_role is None:
             raise ValueError("Environment variable PREMIUM_ROLE is not defined")
-        self.premium_role = int(premium_role_env)
+        self.premium_role = settings.premium_role
 
-        subscriber_role_env = os.getenv("SUBSCRIBER_ROLE")
-        if subscriber_role_env is None:
+        if settings.subscriber_role is None:
             raise ValueError("Environmant variable SUBSCRIBER_ROLE is not defined")
-        self.subscriber_role = int(subscriber_role_env)
+        self.subscriber_role = settings.subscriber_role
+
+        self.replies = ReplyBatcher(settings.reply_window)
+        self.attendances = AttendanceQueue(self.process_attendance, self.replies)
+        self.queue_gauge = metrics.registry.register(
+            metrics.Gauge(
+                "lara_attendance_queue",
+                "출석 요청 대기열 상태",
+                ["stat"],
+                lambda: {
+                    ("pending",): len(self.attendances),
+                    ("merged",): self.attendances.merged,
+                },
+            )
+        )
+
+    async def drain(self):
+        """
+        봇을 종료하기 전에 대기열에 남은 출석 요청을 처리하고 답장을 보냅니다.
+        """
+        try:
+            await self.attendances.join()
+        finally:
+            # 종료 기한이 지나 취소되더라도, 이미 처리한 출석의 답장은 보냅니다.
+            await self.replies.close()
+
+    def cog_unload(self):
+        self.attendances.stop()
+        asyncio.ensure_future(self.replies.close())
+        metrics.registry.unregister(self.queue_gauge)
 
     async def cog_check(self, ctx):
         return ctx.guild is not None and ctx.guild.id in self.guild_whitelist
 
     async def cog_command_error(self, ctx, error):
+        if isinstance(error, cooldown.CooldownRejected):
+            return
+
         if isinstance(error, commands.CheckFailure):
             await ctx.send("⚠️ **팀 크레센도 디스코드**에서만 사용 가능한 명령어입니다.")
             return
 
+        original = getattr(error, "original", None)
+        if isinstance(original, api.ForteError):
+            self.logger.warning(f"{ctx.author.id} {ctx.command} failure, {original!r}")
+            await ctx.send(f"{ctx.author.mention}, {original}")
+            return
+
         self.logger.error(str(error))
 
     def is_premium(self, ctx: commands.Context) -> bool:
@@ -85,50 +234,58 @@ class User(commands.Cog):
     @commands.command(
         "출석", aliases=["출석체크", "출첵", "ㅊ"], brief="팀 크레센도 디스코드 서버에 출석하고 열쇠를 얻습니다.",
     )
+    @cooldown.limit(1, 5)
     async def attend(self, ctx):
-        user, _ = await request("get", f"/discords/{ctx.author.id}")
+        self.attendances.put(ctx)
+
+    async def process_attendance(self, ctx) -> str:
+        """
+        출석 대기열의 작업자가 호출합니다. 사용자에게 보낼 답장을 반환합니다.
+        """
+        user = await api.get_discord_user(ctx.author.id)
         if len(user) == 0:
-            return await ctx.send(
-                f"""{ctx.author.mention}, ⚠️ 팀 크레센도 FORTE에 가입하지 않은 계정입니다.
+            return f"""{ctx.author.mention}, ⚠️ 팀 크레센도 FORTE에 가입하지 않은 계정입니다.
 출석체크 보상으로 POINT를 지급받기 위해선 FORTE 가입이 필요합니다.
 하단의 링크에서 Discord 계정 연동을 통해 가입해주세요.
 > https://forte.team-crescendo.me/login/discord"""
-            )
 
         try:
             key_count = await api.post_attendace(ctx.author.id)
         except api.AttendanceError as e:
-            self.logger.log(e.level, f"{ctx.author.id} attend failure, {e.status}")
-            return await ctx.send(f"{ctx.author.mention}, {e}")
+            self.logger.log(
+                e.level,
+                f"{ctx.author.id} attend failure, {e.status}",
+                extra={"user_id": ctx.author.id, "command": "attend", "status": e.status},
+            )
+            metrics.attendance_errors_total.inc(status=e.status)
+            return f"{ctx.author.mention}, {e}"
 
-        self.logger.info(f"{ctx.author.id} attend success, key_count = {key_count}")
-        progress = key_count * "🔑" + (10 - key_count) * "❔"
-        return await ctx.send(
-            f"""{ctx.author.mention}, ⚡ **출석 체크 완료!**
+        self.logger.info(
+            f"{ctx.author.id} attend success, key_count = {key_count}",
+            extra={"user_id": ctx.author.id, "command": "attend", "status": "success"},
+        )
+        progress = key_count * "🔑" + (api.max_key_count - key_count) * "❔"
+        return f"""{ctx.author.mention}, ⚡ **출석 체크 완료!**
 
 {progress}
 
 모은 열쇠로 상자를 열면 POINT를 받을 수 있습니다. (`라라야 상자` 입력)
 
 ※ `💎Premium` 역할을 갖고 있으면 상자를 열 때 필요한 열쇠가 줄어듭니다. (<#748566390528671774> 확인)"""
-        )
 
     async def select_box(self, ctx: commands.Context) -> str:
         """
         사용자의 입력에 따라 TimeoutError 또는 KeyError가 발생할 수 있습니다.
         """
-        is_premium = self.is_premium(ctx)
-        description = "\n".join(
-            describe_box(box, is_premium) for box in box_types.values()
+        catalog.refresh()
+        prompt = await ctx.send(
+            ctx.author.mention, embed=catalog.menu_embeds[self.is_premium(ctx)]
         )
-        embed = Embed(title="어떤 상자를 열어볼까요?", description=description)
-
-        prompt = await ctx.send(ctx.author.mention, embed=embed)
-        emoji_map = {box["emoji"]: key for key, box in box_types.items()}
-        user_input = await interface.input_emojis(ctx, prompt, [*emoji_map.keys(), "❌"])
-        return emoji_map[user_input]
+        user_input = await interface.input_emojis(ctx, prompt, catalog.menu_emojis)
+        return catalog.by_emoji[user_input]
 
     @commands.command("상자", brief="열쇠를 사용하여 상자를 열고 확률적으로 포인트를 받습니다.")
+    @cooldown.limit(5, 60, concurrency=1)
     async def unpack_box(self, ctx):
         key_count = await api.get_key_count(ctx.author.id)
         if key_count == 0:
@@ -139,31 +296,58 @@ class User(commands.Cog):
             return
 
         box_type = await self.select_box(ctx)
+        box = catalog.boxes[box_type]
 
         prompt = await ctx.send(
-            ctx.author.mention,
-            embed=box_open_view(box_types[box_type], self.is_premium(ctx), key_count),
+            ctx.author.mention, embed=box.open_view(self.is_premium(ctx), key_count)
         )
         if await interface.is_confirmed(ctx, prompt):
             await prompt.edit(
-                content=f"{ctx.author.mention}, **{box_types[box_type]['name']}**를 여는 중...",
+                content=f"{ctx.author.mention}, **{box.name}**를 여는 중...",
                 embed=None,
             )
             try:
+                started = time.perf_counter()
                 point, remaining_keys = await api.unpack_box(
                     ctx.author.id, box_type, self.is_premium(ctx)
                 )
+                ledger.record(
+                    "unpack",
+                    ctx.author.id,
+                    point,
+                    time.perf_counter() - started,
+                    discord_id=ctx.author.id,
+                )
                 self.logger.info(
-                    f"{ctx.author.id} unpack success, {box_type}, point = {point}, key_count = {remaining_keys}"
+                    f"{ctx.author.id} unpack success, {box_type}, point = {point}, key_count = {remaining_keys}",
+                    extra={
+                        "user_id": ctx.author.id,
+                        "command": "unpack_box",
+                        "status": "success",
+                    },
                 )
                 await ctx.send(
                     f"{ctx.author.mention}, 상자를 열어 **{point}P**를 얻었습니다! (남은 열쇠: **{remaining_keys}개**)"
                 )
             except api.AttendanceError as e:
-                self.logger.log(e.level, f"{ctx.author.id} unpack failure, {e.status}")
+                self.logger.log(
+                    e.level,
+                    f"{ctx.author.id} unpack failure, {e.status}",
+                    extra={
+                        "user_id": ctx.author.id,
+                        "command": "unpack_box",
+                        "status": e.status,
+                    },
+                )
+                metrics.attendance_errors_total.inc(status=e.status)
+                if e.status == "insufficient_key":
+                    # 캐시된 열쇠 개수가 실제와 달랐으므로 FORTE의 값으로 맞춥니다.
+                    await api.get_key_count(ctx.author.id, fresh=True)
                 return await ctx.send(f"{ctx.author.mention}, {e}")
 
     @commands.command("구독", brief="전용 구독자 역할을 지급받거나 반환합니다.")
+    @cooldown.limit(1, 10)
+    @cooldown.limit(30, 60, scope="guild")
     async def subscribe(self, ctx):
         role = ctx.guild.get_role(self.subscriber_role)
         if role is None:
@@ -1,21 +1,103 @@
 import asyncio
-from typing import List
+from typing import Callable, Dict, Hashable, List, Tuple
 
 import discord
 from discord.ext import commands
 
 
+class Dispatcher:
+    """
+    사용자의 반응과 메시지를 기다리는 요청들을 모아 둡니다.
+
+    반응은 메시지 ID별로, 메시지는 (채널 ID, 작성자 ID)별로 분류해 두기 때문에
+    이벤트가 들어올 때마다 모든 대기 요청을 확인하지 않고 해당하는 요청만 확인합니다.
+    """
+
+    def __init__(self) -> None:
+        # 메시지 ID -> [(사용자 ID, Future)]
+        self.reactions: Dict[int, List[Tuple[int, asyncio.Future]]] = {}
+        # (채널 ID, 작성자 ID) -> [(조건, Future)]
+        self.messages: Dict[Tuple[int, int], List[Tuple[Callable, asyncio.Future]]] = {}
+
+    def attach(self, bot: commands.Bot) -> None:
+        bot.add_listener(self.on_raw_reaction_add)
+        bot.add_listener(self.on_message)
+
+    def expect_reaction(self, message_id: int, user_id: int) -> asyncio.Future:
+        """
+        message_id 메시지에 user_id 사용자가 반응을 추가하면 그 이모지를 결과로 갖는 Future를 반환합니다.
+        """
+        return self._register(self.reactions, message_id, user_id)
+
+    def expect_message(
+        self, channel_id: int, author_id: int, check: Callable[[discord.Message], bool]
+    ) -> asyncio.Future:
+        return self._register(self.messages, (channel_id, author_id), check)
+
+    def _register(self, table: Dict, key: Hashable, condition) -> asyncio.Future:
+        future = asyncio.get_event_loop().create_future()
+        entry = (condition, future)
+        table.setdefault(key, []).append(entry)
+
+        def unregister(_):
+            waiters = table.get(key, [])
+            if entry in waiters:
+                waiters.remove(entry)
+            if not waiters:
+                table.pop(key, None)
+
+        # 결과를 받았거나, 시간 초과로 취소되면 목록에서 제거합니다.
+        future.add_done_callback(unregister)
+        return future
+
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        for user_id, future in list(self.reactions.get(payload.message_id, ())):
+            if user_id == payload.user_id and not future.done():
+                future.set_result(str(payload.emoji))
+
+    async def on_message(self, message: discord.Message):
+        key = (message.channel.id, message.author.id)
+        for check, future in list(self.messages.get(key, ())):
+            if not future.done() and check(message):
+                future.set_result(message)
+
+
+dispatcher = Dispatcher()
+
+
 async def input_emojis(
     ctx: commands.Context, message: discord.Message, emojis: List[str]
 ) -> str:
-    for emoji in emojis:
-        await message.add_reaction(emoji)
+    # 반응을 모두 추가하기 전에 사용자가 누른 반응도 받을 수 있도록 먼저 대기를 등록합니다.
+    answer = dispatcher.expect_reaction(message.id, ctx.author.id)
+
+    async def add_reactions():
+        for emoji in emojis:
+            await message.add_reaction(emoji)
+
+    def propagate_error(task: asyncio.Future):
+        if task.cancelled() or answer.done():
+            return
+        error = task.exception()
+        if error is not None:
+            answer.set_exception(error)
+
+    adding = asyncio.ensure_future(add_reactions())
+    adding.add_done_callback(propagate_error)
+    try:
+        return await asyncio.wait_for(answer, timeout=60.0)
+    finally:
+        adding.cancel()
 
-    def _check(reaction, user):
-        return reaction.message.id == message.id and user == ctx.author
 
-    reaction, _ = await ctx.bot.wait_for("reaction_add", check=_check, timeout=60.0)
-    return reaction.emoji
+async def wait_for_message(
+    ctx: commands.Context, check: Callable[[discord.Message], bool], timeout: float
+) -> discord.Message:
+    """
+    ctx의 채널에서 ctx의 작성자가 보낸, check 조건을 만족하는 메시지를 기다립니다.
+    """
+    answer = dispatcher.expect_message(ctx.channel.id, ctx.author.id, check)
+    return await asyncio.wait_for(answer, timeout=timeout)
 
 
 async def is_confirmed(ctx: commands.Context, message: discord.Message) -> bool:
@@ -0,0 +1,158 @@
+import codecs
+import json
+import json.scanner
+import logging
+import re
+from typing import Any, Callable, List, Match, Optional, cast
+
+import aiohttp
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger("lara.jsonstream")
+
+# JSONDecoder.raw_decode()가 내부에서 사용하는 C 스캐너입니다. 원소마다 호출하므로 직접 사용합니다.
+# (typeshed에는 인자가 JSONDecoder가 아닌 스캐너로 선언되어 있어 cast합니다.)
+scan_once = json.scanner.make_scanner(cast(Any, json.JSONDecoder()))
+separator = re.compile(r"[ \t\n\r]*(,)?[ \t\n\r]*")
+whitespace = " \t\n\r"
+terminators = whitespace + ",]"
+
+
+def backend_name(backend: str) -> str:
+    """
+    backend(auto, json, orjson)에 따라 실제로 사용할 JSON 라이브러리 이름을 반환합니다.
+    auto는 orjson이 설치되어 있으면 orjson을 사용합니다.
+    """
+    if backend == "orjson" and orjson is None:
+        logger.warning("orjson is not installed, falling back to json")
+    if backend in ("auto", "orjson") and orjson is not None:
+        return "orjson"
+    return "json"
+
+
+def loader(backend: str) -> Callable[[bytes], Any]:
+    if backend_name(backend) == "orjson" and orjson is not None:
+        return orjson.loads
+    return lambda data: json.loads(data.decode("utf-8"))
+
+
+def check_content_type(resp: aiohttp.ClientResponse) -> None:
+    """
+    resp.json()과 마찬가지로 JSON이 아닌 응답(프록시의 에러 페이지 등)이면 ContentTypeError를 발생시킵니다.
+    """
+    if "json" not in resp.content_type:
+        raise aiohttp.ContentTypeError(
+            resp.request_info,
+            resp.history,
+            message=f"Attempt to decode JSON with unexpected mimetype: {resp.content_type}",
+            headers=resp.headers,
+        )
+
+
+async def read_json(
+    resp: aiohttp.ClientResponse, loads: Callable[[bytes], Any] = loader("json")
+) -> Any:
+    """
+    응답 본문 전체를 받은 뒤 loads로 디코딩합니다. 본문이 비어 있으면 None을 반환합니다.
+    """
+    check_content_type(resp)
+    data = await resp.read()
+    if not data.strip():
+        return None
+    return loads(data)
+
+
+class ArrayDecoder:
+    """
+    JSON 배열을 조각 단위로 받아 원소를 하나씩 디코딩합니다.
+
+    predicate를 통과한 원소만 보관하므로, 응답 전체를 문자열과 객체로 동시에 들고 있지 않아도 됩니다.
+    본문이 배열이 아니면(에러 응답 등) 끝까지 모은 뒤 한 번에 디코딩한 결과를 돌려줍니다.
+    """
+
+    def __init__(self, predicate: Optional[Callable[[Any], bool]] = None) -> None:
+        self.predicate = predicate
+        self.text = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        # None: 아직 모름, True: 배열, False: 배열이 아님
+        self.is_array: Optional[bool] = None
+        self.closed = False
+        self.items: List[Any] = []
+        self.decoded = 0
+
+    def feed(self, chunk: bytes) -> None:
+        self.buffer += self.text.decode(chunk)
+        if self.is_array is None:
+            stripped = self.buffer.lstrip(whitespace)
+            if not stripped:
+                return
+            self.is_array = stripped[0] == "["
+            if self.is_array:
+                self.buffer = stripped[1:]
+        if self.is_array:
+            self.parse()
+
+    def parse(self) -> None:
+        buffer = self.buffer
+        pos = 0
+        length = len(buffer)
+        while not self.closed:
+            # pos는 항상 '[' 또는 원소 바로 뒤이므로 구분자를 한 번에 건너뜁니다.
+            # separator는 빈 문자열과도 일치하므로 결과가 None이 되지 않습니다.
+            match = cast(Match[str], separator.match(buffer, pos))
+            start = match.end()
+            if start >= length:
+                break
+            comma = match.group(1) is not None
+            if buffer[start] == "]" and not comma:
+                self.closed = True
+                pos = start + 1
+                break
+            if comma != (self.decoded > 0):
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, start)
+
+            try:
+                item, end = scan_once(buffer, start)
+            except (StopIteration, json.JSONDecodeError):
+                # 원소가 아직 다 도착하지 않았습니다. 잘못된 원소라면 close()에서 에러가 발생합니다.
+                break
+            # 숫자는 다음 조각에서 이어질 수 있으므로("2." + "5") 구분자가 올 때까지 기다립니다.
+            if not isinstance(item, (dict, list, str)) and (
+                end >= length or buffer[end] not in terminators
+            ):
+                break
+            pos = end
+            self.decoded += 1
+            if self.predicate is None or self.predicate(item):
+                self.items.append(item)
+        self.buffer = buffer[pos:]
+
+    def close(self) -> Any:
+        self.buffer += self.text.decode(b"", final=True)
+        if self.is_array:
+            self.parse()
+            if not self.closed or self.buffer.strip(whitespace):
+                raise json.JSONDecodeError("unterminated array", self.buffer, 0)
+            return self.items
+        if not self.buffer.strip(whitespace):
+            return None
+        return json.loads(self.buffer)
+
+
+async def read_array(
+    resp: aiohttp.ClientResponse,
+    predicate: Optional[Callable[[Any], bool]] = None,
+    chunk_size: int = 65536,
+) -> Any:
+    """
+    응답 본문을 받는 대로 디코딩해 predicate를 통과한 배열 원소의 목록을 반환합니다.
+    """
+    check_content_type(resp)
+    decoder = ArrayDecoder(predicate)
+    async for chunk in resp.content.iter_chunked(chunk_size):
+        decoder.feed(chunk)
+    return decoder.close()
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+import metrics
+from config import config
+from store import Store, store
+
+logger = logging.getLogger("lara.ledger")
+
+
+class Ledger:
+    """
+    포인트 지급, 청약철회, 상자 열기처럼 포인트가 오간 기록을 store의 ledger 테이블에 남깁니다.
+
+    record()는 기록을 메모리에 모으기만 하므로 명령어 처리를 기다리게 하지 않습니다.
+    모인 기록은 flush_interval 초마다, 또는 batch_size개가 모이면 하나의 트랜잭션으로 기록합니다.
+    """
+
+    def __init__(self, store: Store, batch_size: int, flush_interval: float) -> None:
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending: List[tuple] = []
+        self.flusher: Optional[asyncio.Future] = None
+        self.written = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def record(
+        self,
+        kind: str,
+        actor_id: int,
+        amount: int,
+        latency: float,
+        user_id: Optional[int] = None,
+        discord_id: Optional[int] = None,
+        receipt_id=None,
+    ) -> None:
+        """
+        kind는 deposit, bulk_deposit, refund, unpack 중 하나입니다.
+        user_id는 FORTE 사용자 ID, discord_id는 디스코드 ID이며 아는 쪽만 지정합니다.
+        """
+        self.pending.append(
+            (
+                time.time(),
+                kind,
+                actor_id,
+                user_id,
+                discord_id,
+                amount,
+                None if receipt_id is None else str(receipt_id),
+                latency,
+            )
+        )
+        if len(self.pending) >= self.batch_size:
+            asyncio.ensure_future(self.flush())
+        elif self.flusher is None:
+            self.flusher = asyncio.ensure_future(self.flush_later())
+
+    async def flush_later(self) -> None:
+        try:
+            await asyncio.sleep(self.flush_interval)
+        finally:
+            self.flusher = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        rows, self.pending = self.pending, []
+        if not rows:
+            return
+        try:
+            await self.store.append_ledger(rows)
+            self.written += len(rows)
+        except Exception:
+            # 기록하지 못한 내용은 로그에라도 남깁니다.
+            self.failed += len(rows)
+            logger.exception(f"failed to write {len(rows)} ledger entries: {rows}")
+
+    async def close(self) -> None:
+        if self.flusher is not None:
+            self.flusher.cancel()
+            self.flusher = None
+        await self.flush()
+
+
+ledger = Ledger(store, config.ledger.batch_size, config.ledger.flush_interval)
+metrics.registry.register(
+    metrics.Gauge(
+        "lara_ledger_entries",
+        "포인트 기록 장부 상태",
+        ["state"],
+        lambda: {
+            ("pending",): len(ledger),
+            ("written",): ledger.written,
+            ("failed",): ledger.failed,
+        },
+    )
+)
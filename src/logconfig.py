@@ -0,0 +1,82 @@
+import atexit
+import json
+import logging
+import logging.config
+import logging.handlers
+import queue
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+# 로그 레코드에 extra로 전달되는 구조화 필드
+structured_fields = ("user_id", "command", "method", "endpoint", "status", "duration")
+
+listeners: List[Tuple[logging.Logger, logging.handlers.QueueListener]] = []
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    로그 레코드를 한 줄짜리 JSON 객체로 출력합니다.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in structured_fields:
+            if hasattr(record, field):
+                data[field] = getattr(record, field)
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def configure(path: Union[str, Path], log_file: Optional[str] = None) -> None:
+    """
+    logging.json 파일로 로깅을 설정합니다.
+
+    log_file(LARA_LOG_FILE)을 지정하면 파일 핸들러의 경로를 그 값으로 바꿉니다.
+
+    "queue" 항목의 "loggers"에 나열된 로거는 레코드를 큐에 넣기만 하고,
+    실제 파일 쓰기는 별도 스레드에서 처리합니다. 이벤트 루프가 디스크 I/O로
+    멈추지 않게 하기 위함입니다.
+    """
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+
+    # 여러 프로세스가 같은 파일을 로테이션하지 않도록 프로세스마다 다른 파일을 지정할 수 있습니다.
+    if log_file:
+        for handler in config.get("handlers", {}).values():
+            if "filename" in handler:
+                handler["filename"] = log_file
+
+    queue_config = config.pop("queue", {})
+    logging.config.dictConfig(config)
+
+    for name in queue_config.get("loggers", []):
+        logger = logging.getLogger(name)
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(
+            records, *logger.handlers, respect_handler_level=True
+        )
+        logger.handlers = [logging.handlers.QueueHandler(records)]
+        listener.start()
+        listeners.append((logger, listener))
+
+    if listeners:
+        atexit.register(stop)
+
+
+def stop() -> None:
+    """
+    큐에 남아 있는 로그를 모두 기록한 뒤 쓰기 스레드를 종료합니다.
+    이후의 로그는 원래 핸들러로 바로 기록됩니다. 여러 번 호출해도 안전합니다.
+    """
+    while listeners:
+        logger, listener = listeners.pop()
+        listener.stop()
+        logger.handlers = list(listener.handlers)
+        for handler in listener.handlers:
+            handler.flush()
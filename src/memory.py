@@ -0,0 +1,84 @@
+import random
+import sys
+from typing import Iterable, List, Tuple
+
+import api
+import interface
+from discord.ext import commands
+
+# 크기를 추정할 때 표본으로 사용할 객체 수
+sample_size = 200
+
+
+def deep_sizeof(obj, depth: int = 3) -> int:
+    """
+    객체와 객체가 가진 문자열, 컨테이너의 크기를 더합니다.
+    다른 디스코드 모델을 가리키는 속성(_state, guild 등)은 참조일 뿐이므로 따라가지 않습니다.
+    """
+    size = sys.getsizeof(obj)
+    if depth <= 0 or isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return size
+
+    if isinstance(obj, dict):
+        return size + sum(
+            deep_sizeof(key, depth - 1) + deep_sizeof(value, depth - 1)
+            for key, value in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(deep_sizeof(item, depth - 1) for item in obj)
+
+    for name in _attribute_names(type(obj)):
+        value = getattr(obj, name, None)
+        if hasattr(value, "_state") and value is not obj:
+            continue
+        size += deep_sizeof(value, depth - 1)
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(
+            {k: v for k, v in vars(obj).items() if not hasattr(v, "_state")}, depth - 1
+        )
+    return size
+
+
+def _attribute_names(cls: type) -> Iterable[str]:
+    for klass in cls.__mro__:
+        slots = getattr(klass, "__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for name in slots:
+            if name not in ("_state", "__weakref__", "__dict__"):
+                yield name
+
+
+def estimate(objects: List) -> int:
+    """
+    표본 객체들의 평균 크기에 전체 개수를 곱해 전체 크기를 추정합니다.
+    """
+    if not objects:
+        return 0
+    sample = random.sample(objects, min(len(objects), sample_size))
+    return sum(map(deep_sizeof, sample)) * len(objects) // len(sample)
+
+
+def cache_report(bot: commands.Bot) -> List[Tuple[str, int, int]]:
+    """
+    캐시 종류별 (이름, 항목 수, 추정 크기(바이트)) 목록을 반환합니다.
+    """
+    guilds = list(bot.guilds)
+    caches = {
+        "guilds": guilds,
+        "channels": [channel for guild in guilds for channel in guild.channels],
+        "roles": [role for guild in guilds for role in guild.roles],
+        "members": [member for guild in guilds for member in guild.members],
+        "users": list(bot.users),
+        "emojis": list(bot.emojis),
+        "messages": list(bot.cached_messages),
+        "forte_users": list(api.user_cache._data.values()),
+        "key_counts": list(api.key_cache._data.values()),
+        "waits": [
+            waiter
+            for table in (interface.dispatcher.reactions, interface.dispatcher.messages)
+            for waiters in table.values()
+            for waiter in waiters
+        ],
+    }
+    return [(name, len(objects), estimate(objects)) for name, objects in caches.items()]
@@ -0,0 +1,201 @@
+import logging
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Tuple, TypeVar
+
+from aiohttp import web
+
+logger = logging.getLogger("lara.metrics")
+
+Labels = Tuple[str, ...]
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in zip(names, values)
+    ]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines += [f"{name}{labels} {value}" for name, labels, value in self.samples()]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in sorted(self.values.items()):
+            yield self.name, _format_labels(self.labelnames, key), value
+
+
+class Gauge(Metric):
+    """
+    값을 조회할 때마다 함수를 호출해 {레이블 값 튜플: 값} 형태의 결과를 얻습니다.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str],
+        collect: Callable[[], Dict[Labels, float]],
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def samples(self):
+        for key, value in sorted(self.collect().items()):
+            yield self.name, _format_labels(self.labelnames, key), value
+
+
+class Summary(Metric):
+    """
+    레이블마다 최근 max_samples개의 관측값을 보관하고, 이를 이용해 분위수를 계산합니다.
+    """
+
+    kind = "summary"
+    quantiles = (0.5, 0.95, 0.99)
+
+    def __init__(self, *args, max_samples: int = 1024, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.max_samples = max_samples
+        self.recent: Dict[Labels, Deque[float]] = {}
+        self.sums: Dict[Labels, float] = {}
+        self.counts: Dict[Labels, int] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        if key not in self.recent:
+            self.recent[key] = deque(maxlen=self.max_samples)
+            self.sums[key] = 0.0
+            self.counts[key] = 0
+        self.recent[key].append(value)
+        self.sums[key] += value
+        self.counts[key] += 1
+
+    def quantile(self, key: Labels, q: float) -> float:
+        values = sorted(self.recent.get(key, ()))
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def samples(self):
+        for key in sorted(self.recent):
+            names = self.labelnames + ("quantile",)
+            for q in self.quantiles:
+                yield self.name, _format_labels(names, key + (str(q),)), self.quantile(
+                    key, q
+                )
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum", labels, self.sums[key]
+            yield f"{self.name}_count", labels, self.counts[key]
+
+
+MetricType = TypeVar("MetricType", bound=Metric)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: MetricType) -> MetricType:
+        self.metrics.append(metric)
+        return metric
+
+    def unregister(self, metric: Metric) -> None:
+        if metric in self.metrics:
+            self.metrics.remove(metric)
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.metrics) + "\n"
+
+
+registry = Registry()
+
+forte_request_seconds = registry.register(
+    Summary(
+        "lara_forte_request_seconds",
+        "FORTE API 요청 처리 시간(초)",
+        ["method", "endpoint"],
+    )
+)
+forte_requests_total = registry.register(
+    Counter(
+        "lara_forte_requests_total",
+        "FORTE API 요청 수",
+        ["method", "endpoint", "status"],
+    )
+)
+command_seconds = registry.register(
+    Summary("lara_command_seconds", "명령어 처리 시간(초)", ["command"])
+)
+commands_total = registry.register(
+    Counter("lara_commands_total", "명령어 호출 수", ["command", "result"])
+)
+attendance_errors_total = registry.register(
+    Counter("lara_attendance_errors_total", "출석 및 상자 열기 실패 수", ["status"])
+)
+
+
+def observe_forte_request(
+    method: str, endpoint: str, status: str, seconds: float
+) -> None:
+    forte_request_seconds.observe(seconds, method=method, endpoint=endpoint)
+    forte_requests_total.inc(method=method, endpoint=endpoint, status=status)
+
+
+def observe_command(command: str, failed: bool, seconds: float) -> None:
+    command_seconds.observe(seconds, command=command)
+    commands_total.inc(command=command, result="error" if failed else "success")
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(
+        text=registry.render(), content_type="text/plain", charset="utf-8"
+    )
+
+
+async def serve(host: str, port: int) -> web.AppRunner:
+    """
+    Prometheus 텍스트 형식의 지표를 제공하는 HTTP 서버를 시작합니다.
+    """
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return runner
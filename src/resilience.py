@@ -0,0 +1,91 @@
+import random
+import time
+from typing import Dict, Tuple
+
+
+class RetryPolicy:
+    """
+    지수적으로 늘어나는 대기 시간에 무작위 지터를 더해 재시도합니다.
+    멱등성이 보장되는 요청에만 사용해야 합니다.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 2.0,
+        retry_statuses: Tuple[int, ...] = (502, 503, 504),
+    ) -> None:
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = retry_statuses
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    연속으로 failure_threshold 번 실패하면 회로를 열어 요청을 바로 거절합니다.
+    reset_timeout 초가 지나면 요청 하나만 통과시켜(half-open) 복구 여부를 확인합니다.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def before_request(self) -> None:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                raise CircuitOpen()
+            self.state = self.HALF_OPEN
+
+        if self.state == self.HALF_OPEN:
+            if self._probing:
+                raise CircuitOpen()
+            self._probing = True
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self) -> None:
+        """
+        성공이나 실패로 판단할 수 없이 요청이 끝났을 때 호출합니다.
+        """
+        self._probing = False
+
+
+class CircuitBreakers:
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, key: str) -> CircuitBreaker:
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            self.breakers[key] = breaker
+        return breaker
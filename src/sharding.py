@@ -0,0 +1,136 @@
+import asyncio
+import fcntl
+import time
+from typing import Dict, List, Optional
+
+import metrics
+from discord.ext import commands
+from discord.http import HTTPClient
+
+
+def parse_shard_ids(text: Optional[str]) -> Optional[List[int]]:
+    """
+    "0-3,6" 형식의 샤드 ID 목록을 읽습니다. 비어 있으면 None을 반환합니다.
+    """
+    if not text or not text.strip():
+        return None
+
+    shard_ids: List[int] = []
+    for part in text.split(","):
+        part = part.strip()
+        if "-" in part:
+            start, end = part.split("-")
+            shard_ids.extend(range(int(start), int(end) + 1))
+        elif part:
+            shard_ids.append(int(part))
+    return sorted(set(shard_ids))
+
+
+def split_shards(shard_count: int, processes: int) -> List[List[int]]:
+    """
+    샤드를 processes 개의 연속된 구간으로 최대한 고르게 나눕니다.
+    """
+    processes = max(1, min(processes, shard_count))
+    size, extra = divmod(shard_count, processes)
+    ranges = []
+    start = 0
+    for index in range(processes):
+        end = start + size + (1 if index < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+async def recommended_shard_count(token: str) -> int:
+    """
+    디스코드가 권장하는 샤드 수를 조회합니다. (SHARD_COUNT=auto)
+    """
+    http = HTTPClient()
+    await http.static_login(token, bot=True)
+    try:
+        shard_count, _ = await http.get_bot_gateway()
+        return shard_count
+    finally:
+        await http.close()
+
+
+def format_shard_ids(shard_ids: List[int]) -> str:
+    if shard_ids == list(range(shard_ids[0], shard_ids[-1] + 1)):
+        return f"{shard_ids[0]}-{shard_ids[-1]}"
+    return ",".join(map(str, shard_ids))
+
+
+class IdentifyGate:
+    """
+    여러 프로세스가 디스코드 게이트웨이에 IDENTIFY를 보내는 간격을 interval 초 이상으로 맞춥니다.
+    마지막으로 IDENTIFY한 시각을 잠금 파일에 기록해 프로세스끼리 공유합니다.
+    """
+
+    def __init__(self, path: str, interval: float) -> None:
+        self.path = path
+        self.interval = interval
+
+    async def wait(self) -> None:
+        while True:
+            remaining = self._try_acquire()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+    def _try_acquire(self) -> float:
+        """
+        IDENTIFY해도 된다면 현재 시각을 기록하고 0을, 아니라면 더 기다려야 하는 시간을 반환합니다.
+        """
+        with open(self.path, "a+") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return 0.05
+
+            f.seek(0)
+            try:
+                last = float(f.read() or 0)
+            except ValueError:
+                last = 0.0
+
+            now = time.time()
+            if now - last < self.interval:
+                return self.interval - (now - last)
+
+            f.seek(0)
+            f.truncate()
+            f.write(str(now))
+            return 0
+
+
+shard_commands_total = metrics.registry.register(
+    metrics.Counter("lara_shard_commands_total", "샤드별 명령어 호출 수", ["shard"])
+)
+
+
+def register_metrics(bot: commands.AutoShardedBot) -> None:
+    """
+    이 프로세스가 맡은 샤드별 게이트웨이 지연 시간과 서버 수를 지표로 내보냅니다.
+    """
+
+    def guild_counts() -> Dict[metrics.Labels, float]:
+        counts: Dict[metrics.Labels, float] = {(str(shard_id),): 0 for shard_id in bot.shards}
+        for guild in bot.guilds:
+            counts[(str(guild.shard_id),)] = counts.get((str(guild.shard_id),), 0) + 1
+        return counts
+
+    metrics.registry.register(
+        metrics.Gauge(
+            "lara_shard_latency_seconds",
+            "샤드별 게이트웨이 하트비트 지연 시간(초)",
+            ["shard"],
+            lambda: {
+                (str(shard_id),): latency
+                for shard_id, latency in bot.latencies
+                if latency == latency  # 아직 측정되지 않은 값(NaN)은 제외합니다.
+            },
+        )
+    )
+    metrics.registry.register(
+        metrics.Gauge("lara_shard_guilds", "샤드별 서버 수", ["shard"], guild_counts)
+    )
@@ -0,0 +1,319 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import config
+
+logger = logging.getLogger("lara.store")
+
+schema = """
+CREATE TABLE IF NOT EXISTS journal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    state TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    flagged INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    owner TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS journal_open ON journal (done, kind);
+CREATE TABLE IF NOT EXISTS ledger (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    kind TEXT NOT NULL,
+    actor_id INTEGER NOT NULL,
+    user_id INTEGER,
+    discord_id INTEGER,
+    amount INTEGER NOT NULL,
+    receipt_id TEXT,
+    latency REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ledger_time ON ledger (created_at);
+CREATE INDEX IF NOT EXISTS ledger_user ON ledger (user_id, created_at)
+    WHERE user_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ledger_discord ON ledger (discord_id, created_at)
+    WHERE discord_id IS NOT NULL;
+CREATE TABLE IF NOT EXISTS ledger_daily (
+    day TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    amount INTEGER NOT NULL,
+    PRIMARY KEY (day, kind)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshot (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    saved_at REAL NOT NULL
+);
+"""
+
+
+class JournalEntry:
+    def __init__(self, row: tuple) -> None:
+        (
+            self.id,
+            self.kind,
+            self.key,
+            self.state,
+            payload,
+            self.done,
+            self.flagged,
+            self.created_at,
+            self.updated_at,
+            self.owner,
+        ) = row
+        self.payload = json.loads(payload)
+
+
+class LedgerEntry:
+    def __init__(self, row: tuple) -> None:
+        (
+            self.id,
+            self.created_at,
+            self.kind,
+            self.actor_id,
+            self.user_id,
+            self.discord_id,
+            self.amount,
+            self.receipt_id,
+            self.latency,
+        ) = row
+
+
+def ledger_day(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+
+
+class Store:
+    """
+    봇을 다시 시작해도 남아야 하는 상태를 저장하는 로컬 SQLite 데이터베이스입니다.
+
+    모든 쿼리는 전용 스레드 하나에서 순서대로 실행되므로 이벤트 루프를 멈추지 않습니다.
+    - journal: 포인트 지급, 청약철회처럼 FORTE에 쓰기 요청을 보내는 작업을 요청 전에 기록하고,
+      단계가 끝날 때마다 갱신합니다. 끝나지 않은 항목은 다음 실행 때 이어서 처리하거나 표시합니다.
+      여러 프로세스가 같은 파일을 사용할 수 있으므로 항목마다 기록한 프로세스(owner)를 저장합니다.
+    - ledger: 포인트가 오간 기록을 추가만 합니다. ledger_daily에 날짜와 종류별 합계를 함께 갱신해
+      기간별 합계를 기록 수와 관계없이 빠르게 조회할 수 있습니다.
+    - snapshot: 종료할 때 캐시 내용을 저장해 두었다가 시작할 때 불러옵니다.
+    """
+
+    def __init__(self, path: str, owner: str = "") -> None:
+        self.path = path
+        # 샤드 프로세스마다 다른 값입니다. (예: "0-3") 샤딩 없이 실행하면 빈 문자열입니다.
+        self.owner = owner
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.executor is not None
+
+    async def _run(self, func, *args, **kwargs) -> Any:
+        if self.executor is None:
+            raise RuntimeError("store is not open")
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    async def open(self) -> None:
+        if self.executor is not None:
+            return
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="lara-store")
+        await self._run(self._connect)
+        logger.info(f"opened {self.path}")
+
+    def _connect(self) -> None:
+        # 연결은 만들어진 스레드(전용 스레드)에서만 사용합니다.
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(schema)
+        # owner 열이 추가되기 전에 만들어진 파일입니다.
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(journal)")}
+        if "owner" not in columns:
+            self.connection.execute(
+                "ALTER TABLE journal ADD COLUMN owner TEXT NOT NULL DEFAULT ''"
+            )
+        self.connection.commit()
+
+    async def close(self) -> None:
+        if self.executor is None:
+            return
+        await self._run(self._disconnect)
+        self.executor.shutdown(wait=True)
+        self.executor = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self.connection is None:
+            raise RuntimeError("store is not open")
+        return self.connection
+
+    def _disconnect(self) -> None:
+        self._connection().close()
+        self.connection = None
+
+    def _execute(self, query: str, params: tuple = ()) -> sqlite3.Cursor:
+        connection = self._connection()
+        cursor = connection.execute(query, params)
+        connection.commit()
+        return cursor
+
+    def _fetch(self, query: str, params: tuple = ()) -> List[tuple]:
+        return self._connection().execute(query, params).fetchall()
+
+    async def begin(self, kind: str, key: str, state: str, payload: dict) -> int:
+        """
+        작업을 시작하기 전에 기록하고, 이후 갱신에 사용할 ID를 반환합니다.
+        """
+        now = time.time()
+        cursor = await self._run(
+            self._execute,
+            "INSERT INTO journal (kind, key, state, payload, created_at, updated_at, owner)"
+            + " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                kind,
+                key,
+                state,
+                json.dumps(payload, ensure_ascii=False),
+                now,
+                now,
+                self.owner,
+            ),
+        )
+        return cursor.lastrowid
+
+    async def update(
+        self, entry_id: int, state: str, payload: Optional[dict] = None, done=False
+    ) -> None:
+        if payload is None:
+            query = "UPDATE journal SET state = ?, done = ?, updated_at = ? WHERE id = ?"
+            params = (state, int(done), time.time(), entry_id)
+        else:
+            query = (
+                "UPDATE journal SET state = ?, payload = ?, done = ?, updated_at = ?"
+                + " WHERE id = ?"
+            )
+            params = (
+                state,
+                json.dumps(payload, ensure_ascii=False),
+                int(done),
+                time.time(),
+                entry_id,
+            )
+        await self._run(self._execute, query, params)
+
+    async def flag(self, entry_id: int) -> None:
+        """
+        자동으로 이어서 처리할 수 없어 관리자의 확인이 필요한 작업으로 표시합니다.
+        """
+        await self._run(
+            self._execute, "UPDATE journal SET flagged = 1 WHERE id = ?", (entry_id,)
+        )
+
+    async def incomplete(
+        self, kind: Optional[str] = None, owner: Optional[str] = None
+    ) -> List[JournalEntry]:
+        """
+        끝나지 않은 항목을 반환합니다. owner를 지정하면 해당 프로세스가 기록한 항목만 반환합니다.
+        """
+        query = "SELECT * FROM journal WHERE done = 0"
+        params: tuple = ()
+        if kind is not None:
+            query += " AND kind = ?"
+            params += (kind,)
+        if owner is not None:
+            query += " AND owner = ?"
+            params += (owner,)
+        rows = await self._run(self._fetch, query + " ORDER BY id", params)
+        return [JournalEntry(row) for row in rows]
+
+    async def append_ledger(self, rows: List[tuple]) -> None:
+        """
+        (created_at, kind, actor_id, user_id, discord_id, amount, receipt_id, latency)
+        튜플 목록을 하나의 트랜잭션으로 기록합니다.
+        """
+        await self._run(self._append_ledger, rows)
+
+    def _append_ledger(self, rows: List[tuple]) -> None:
+        totals: Dict[Tuple[str, str], List[int]] = {}
+        for row in rows:
+            total = totals.setdefault((ledger_day(row[0]), row[1]), [0, 0])
+            total[0] += 1
+            total[1] += row[5]
+
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT INTO ledger (created_at, kind, actor_id, user_id, discord_id,"
+                + " amount, receipt_id, latency) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            for (day, kind), (count, amount) in totals.items():
+                connection.execute(
+                    "INSERT OR IGNORE INTO ledger_daily VALUES (?, ?, 0, 0)", (day, kind)
+                )
+                connection.execute(
+                    "UPDATE ledger_daily SET count = count + ?, amount = amount + ?"
+                    + " WHERE day = ? AND kind = ?",
+                    (count, amount, day, kind),
+                )
+
+    async def ledger_totals(self, since: float) -> List[Tuple[str, int, int]]:
+        """
+        since가 속한 날부터 지금까지 종류별 (종류, 건수, 포인트 합계) 목록을 반환합니다.
+        """
+        return await self._run(
+            self._fetch,
+            "SELECT kind, SUM(count), SUM(amount) FROM ledger_daily"
+            + " WHERE day >= ? GROUP BY kind ORDER BY kind",
+            (ledger_day(since),),
+        )
+
+    async def ledger_user_totals(
+        self, user_id: Optional[int], discord_id: Optional[int]
+    ) -> List[Tuple[str, int, int]]:
+        """
+        FORTE 사용자 ID 또는 디스코드 ID가 일치하는 기록의 종류별 (종류, 건수, 포인트 합계) 목록입니다.
+        """
+        return await self._run(
+            self._fetch,
+            "SELECT kind, COUNT(*), SUM(amount) FROM ledger"
+            + " WHERE user_id = ? OR discord_id = ? GROUP BY kind ORDER BY kind",
+            (user_id, discord_id),
+        )
+
+    async def ledger_user_entries(
+        self, user_id: Optional[int], discord_id: Optional[int], limit: int
+    ) -> List[LedgerEntry]:
+        rows = await self._run(
+            self._fetch,
+            "SELECT * FROM ledger WHERE user_id = ? OR discord_id = ?"
+            + " ORDER BY created_at DESC LIMIT ?",
+            (user_id, discord_id, limit),
+        )
+        return [LedgerEntry(row) for row in rows]
+
+    async def save_snapshot(self, name: str, data: Any) -> None:
+        await self._run(
+            self._execute,
+            "INSERT OR REPLACE INTO snapshot (name, data, saved_at) VALUES (?, ?, ?)",
+            (name, json.dumps(data, ensure_ascii=False), time.time()),
+        )
+
+    async def load_snapshot(self, name: str) -> Optional[Any]:
+        rows = await self._run(
+            self._fetch, "SELECT data FROM snapshot WHERE name = ?", (name,)
+        )
+        if not rows:
+            return None
+        return json.loads(rows[0][0])
+
+
+store = Store(config.bot.store_path)
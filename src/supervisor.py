@@ -0,0 +1,219 @@
+"""
+샤드를 여러 봇 프로세스로 나누어 실행하고, 비정상 종료된 프로세스를 다시 시작합니다.
+
+    $ SHARD_COUNT=8 SHARD_PROCESSES=4 python3 src/supervisor.py
+
+SIGINT/SIGTERM을 받으면 모든 봇 프로세스에 SIGINT를 보내고 종료될 때까지 기다립니다.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import logconfig
+import sharding
+from config import config
+from discord.http import Route
+
+logger = logging.getLogger("lara.supervisor")
+
+bot_path = Path(__file__).resolve().parent / "bot.py"
+health_file = config.bot.health_file
+log_file = config.bot.log_file or "lara.log"
+metrics_port = config.bot.metrics_port
+shutdown_deadline = config.bot.shutdown_deadline
+restart_max_delay = config.supervisor.restart_max_delay
+
+
+class Worker:
+    """
+    샤드 구간 하나를 맡는 봇 프로세스입니다.
+    """
+
+    def __init__(self, index: int, shard_count: int, shard_ids: List[int]) -> None:
+        self.index = index
+        self.shard_count = shard_count
+        self.shard_ids = shard_ids
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.started_at = 0.0
+        self.restarts = 0
+
+    @property
+    def health_file(self) -> str:
+        return f"{health_file}.{self.index}"
+
+    def environment(self) -> Dict[str, str]:
+        root, ext = os.path.splitext(log_file)
+        env = dict(
+            os.environ,
+            SHARD_COUNT=str(self.shard_count),
+            SHARD_IDS=sharding.format_shard_ids(self.shard_ids),
+            LARA_HEALTH_FILE=self.health_file,
+            LARA_LOG_FILE=f"{root}.{self.index}{ext}",
+        )
+        if metrics_port:
+            env["METRICS_PORT"] = str(metrics_port + self.index)
+        return env
+
+    async def start(self) -> asyncio.subprocess.Process:
+        if os.path.exists(self.health_file):
+            os.remove(self.health_file)
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, str(bot_path), env=self.environment()
+        )
+        self.process = process
+        self.started_at = time.monotonic()
+        logger.info(
+            f"started worker {self.index} (pid {process.pid}) "
+            + f"for shards {sharding.format_shard_ids(self.shard_ids)}"
+        )
+        return process
+
+    def state(self) -> str:
+        try:
+            with open(self.health_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return "starting"
+        if self.process is None or data.get("pid") != self.process.pid:
+            return "starting"
+        return data.get("state", "starting")
+
+
+class Supervisor:
+    def __init__(self, shard_count: int, processes: int) -> None:
+        self.workers = [
+            Worker(index, shard_count, shard_ids)
+            for index, shard_ids in enumerate(
+                sharding.split_shards(shard_count, processes)
+            )
+        ]
+        self.stopping = False
+        self.killer: Optional[asyncio.Future] = None
+
+    def write_health(self, state: str) -> None:
+        data = {
+            "pid": os.getpid(),
+            "state": state,
+            "updated_at": time.time(),
+            "workers": {
+                worker.index: {
+                    "pid": worker.process.pid if worker.process else None,
+                    "shards": worker.shard_ids,
+                    "state": worker.state(),
+                    "restarts": worker.restarts,
+                }
+                for worker in self.workers
+            },
+        }
+        temp_file = f"{health_file}.tmp"
+        with open(temp_file, "w") as f:
+            json.dump(data, f)
+        os.replace(temp_file, health_file)
+
+    async def run(self) -> None:
+        loop = asyncio.get_event_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
+
+        self.write_health("starting")
+        tasks = [asyncio.ensure_future(self.keep_alive(w)) for w in self.workers]
+        reporter = asyncio.ensure_future(self.report_health())
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            reporter.cancel()
+            if self.killer is not None:
+                self.killer.cancel()
+        self.write_health("stopped")
+
+    async def keep_alive(self, worker: Worker) -> None:
+        """
+        프로세스가 종료되면 다시 시작합니다. 곧바로 다시 죽는 경우를 대비해 대기 시간을 늘려 갑니다.
+        이전 프로세스가 완전히 종료된 뒤에 시작하므로 같은 샤드가 동시에 두 번 접속하지 않습니다.
+        """
+        delay = 1.0
+        while not self.stopping:
+            process = await worker.start()
+            code = await process.wait()
+            if self.stopping:
+                break
+
+            uptime = time.monotonic() - worker.started_at
+            if uptime > restart_max_delay:
+                delay = 1.0
+            worker.restarts += 1
+            logger.warning(
+                f"worker {worker.index} exited with {code} after {uptime:.0f}s, "
+                + f"restarting in {delay:.0f}s"
+            )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, restart_max_delay)
+
+    async def report_health(self) -> None:
+        while True:
+            states = {worker.state() for worker in self.workers}
+            if self.stopping:
+                self.write_health("draining")
+            else:
+                self.write_health("ready" if states == {"ready"} else "starting")
+            await asyncio.sleep(1)
+
+    def stop(self) -> None:
+        if self.stopping:
+            return
+        logger.info("stopping workers")
+        self.stopping = True
+        self.write_health("draining")
+        for worker in self.workers:
+            if worker.process is not None and worker.process.returncode is None:
+                worker.process.send_signal(signal.SIGINT)
+        self.killer = asyncio.ensure_future(self.kill_after(shutdown_deadline + 15))
+
+    async def kill_after(self, timeout: float) -> None:
+        await asyncio.sleep(timeout)
+        for worker in self.workers:
+            if worker.process is not None and worker.process.returncode is None:
+                logger.error(f"worker {worker.index} did not stop, killing")
+                worker.process.kill()
+
+
+def resolve_shard_count() -> int:
+    """
+    SHARD_COUNT를 정수로 바꿉니다. auto이면 시작할 때 디스코드가 권장하는 샤드 수를 사용하며,
+    모든 프로세스가 같은 값을 사용해야 하므로 프로세스를 다시 시작해도 바꾸지 않습니다.
+    """
+    value = config.bot.shard_count or "1"
+    if value == "auto":
+        if not config.bot.token:
+            raise SystemExit("BOT_TOKEN is required to use SHARD_COUNT=auto")
+        loop = asyncio.get_event_loop()
+        count = loop.run_until_complete(sharding.recommended_shard_count(config.bot.token))
+        logger.info(f"using {count} shards recommended by discord")
+        return count
+    try:
+        return int(value)
+    except ValueError:
+        raise SystemExit(f"SHARD_COUNT must be a number or auto, not {value!r}")
+
+
+def main():
+    logconfig.configure(config.bot.log_config, config.bot.log_file)
+    # 로컬 테스트용 가짜 게이트웨이를 사용할 때만 설정합니다.
+    if config.bot.discord_api_base:
+        # Route.BASE는 문자열 리터럴로 선언되어 있어 setattr로 바꿉니다.
+        setattr(Route, "BASE", config.bot.discord_api_base)
+
+    supervisor = Supervisor(resolve_shard_count(), config.supervisor.processes)
+    asyncio.get_event_loop().run_until_complete(supervisor.run())
+    logconfig.stop()
+
+
+if __name__ == "__main__":
+    main()
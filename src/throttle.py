@@ -0,0 +1,121 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Optional, Tuple
+
+
+class ThrottleTimeout(Exception):
+    pass
+
+
+class Throttle:
+    """
+    토큰 버킷 방식의 초당 요청 수 제한과 동시 요청 수 제한을 함께 적용합니다.
+    대기 중인 호출자는 도착한 순서대로 처리되며, max_wait 초 이상 기다리면
+    ThrottleTimeout이 발생합니다. rate가 0 이하이면 초당 요청 수는 제한하지 않습니다.
+    """
+
+    def __init__(
+        self, rate: float, burst: int, max_in_flight: int, max_wait: Optional[float]
+    ) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.max_in_flight = max_in_flight
+        self.max_wait = max_wait
+
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        # 이벤트 루프가 시작된 뒤에 생성합니다. (_primitives())
+        self._lock: Optional[asyncio.Lock] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # 모니터링 지표
+        self.waiting = 0
+        self.in_flight = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait_seen = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "avg_wait": self.total_wait / self.acquired if self.acquired else 0.0,
+            "max_wait": self.max_wait_seen,
+        }
+
+    def _primitives(self) -> Tuple[asyncio.Lock, asyncio.Semaphore]:
+        if self._lock is None or self._semaphore is None:
+            self._lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._lock, self._semaphore
+
+    @asynccontextmanager
+    async def slot(self):
+        _, semaphore = self._primitives()
+        self.waiting += 1
+        started = time.monotonic()
+        task = asyncio.ensure_future(self._acquire())
+        try:
+            done, _ = await asyncio.wait({task}, timeout=self.max_wait)
+        except asyncio.CancelledError:
+            self._abandon(task)
+            raise
+        finally:
+            self.waiting -= 1
+
+        if not done:
+            self._abandon(task)
+            self.rejected += 1
+            raise ThrottleTimeout(f"waited more than {self.max_wait}s for a slot")
+        task.result()
+
+        waited = time.monotonic() - started
+        self.acquired += 1
+        self.total_wait += waited
+        self.max_wait_seen = max(self.max_wait_seen, waited)
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            semaphore.release()
+
+    async def _acquire(self) -> None:
+        # 락을 잡은 채로 토큰과 슬롯을 기다리므로, 대기열의 맨 앞 호출자부터 진행됩니다.
+        lock, semaphore = self._primitives()
+        async with lock:
+            await self._take_token()
+            await semaphore.acquire()
+
+    async def _take_token(self) -> None:
+        if self.rate <= 0:
+            return
+
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def _abandon(self, task: asyncio.Future) -> None:
+        """
+        포기한 대기 요청을 취소합니다. 취소되기 직전에 슬롯을 얻었다면 반납합니다.
+        """
+        _, semaphore = self._primitives()
+
+        def release_if_acquired(t: asyncio.Future) -> None:
+            if not t.cancelled() and t.exception() is None:
+                semaphore.release()
+
+        task.cancel()
+        task.add_done_callback(release_if_acquired)